@@ -0,0 +1,48 @@
+from pypokerengine.players import BasePokerPlayer
+from CFRPolicy import CFRPolicy, historyFromRoundState
+import os
+
+# the policy is not shipped, train one with mcts/CFRTrainer.py
+DEFAULT_POLICY_FILE = "cfr_policy.json"
+
+class CFRPlayer(BasePokerPlayer):
+	notifications = frozenset()
+
+	def __init__(self, policyFile=DEFAULT_POLICY_FILE):
+		self.policyFile = policyFile
+		self.policy = self.load_policy()
+
+	def load_policy(self):
+		if not os.path.exists(self.policyFile):
+			raise FileNotFoundError(f"CFR policy {self.policyFile} not found, train one with: PYTHONPATH=. python mcts/CFRTrainer.py -o {self.policyFile}")
+		policy = CFRPolicy.loadShared(self.policyFile)
+		return policy
+
+	def declare_action(self, validActions, holeCard, roundState):
+		# betting history in the trainer's format, eg "rc/cr"
+		history = historyFromRoundState(roundState)
+
+		action = self.policy.getAction(holeCard, roundState["community_card"], roundState["street"], history, self.rng)
+
+		# the engine allows more raises than the abstraction, call when the policy's choice is not valid
+		if action not in [validAction["action"] for validAction in validActions]:
+			return "call"
+		return action
+
+	def receive_game_start_message(self, game_info):
+		pass
+
+	def receive_round_start_message(self, round_count, hole_card, seats):
+		pass
+
+	def receive_street_start_message(self, street, round_state):
+		pass
+
+	def receive_game_update_message(self, action, round_state):
+		pass
+
+	def receive_round_result_message(self, winners, hand_info, round_state):
+		pass
+
+def setup_ai():
+	return CFRPlayer()
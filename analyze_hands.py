@@ -0,0 +1,43 @@
+""" Statistics of logged hands, and the profit of every player per StateAbstraction preflop bucket.
+
+Log the hands with Config.set_hand_history(HandHistoryWriter(path)) while playing, then
+
+$ python analyze_hands.py hands.bin [more.bin ...]
+"""
+from pypokerengine.engine.card import Card
+from pypokerengine.utils.hand_history_analytics import load_hand_histories, player_stats, profit_by_bucket
+from state_abstraction import StateAbstraction
+from argparse import ArgumentParser
+import numpy as np
+
+def preflop_bucket_table():
+	"""(53, 53) array of StateAbstraction.pre_flop_abstraction for every pair of hole card ids"""
+	abstraction = StateAbstraction()
+	table = np.zeros((53, 53), dtype=np.int64)
+	for id1 in range(1, 53):
+		for id2 in range(1, 53):
+			if id1 != id2:
+				table[id1, id2] = int(abstraction.pre_flop_abstraction([str(Card.from_id(id1)), str(Card.from_id(id2))]))
+	return table
+
+def analyze(paths):
+	hands = load_hand_histories(paths)
+	print("%d hands of %d players" % (len(hands.rounds), len(hands.players)))
+
+	for name, stats in player_stats(hands).items():
+		print("\n %s: %d hands, VPIP %.1f%%, PFR %.1f%%, aggression %.2f, won %.1f%% of %d showdowns, %+d chips (%+.1f bb/100)" % (
+			name, stats['hands'], 100 * stats['vpip'], 100 * stats['pfr'], stats['aggression'],
+			100 * stats['showdown_win_rate'], stats['showdowns'], stats['net'], stats['bb_per_100']))
+
+	for name, buckets in profit_by_bucket(hands, preflop_bucket_table()).items():
+		print("\n %s by preflop bucket:" % name)
+		for bucket, profit in sorted(buckets.items()):
+			print("   bucket %d: %7d hands, %+9d chips, %+8.1f per hand" % (bucket, profit['hands'], profit['net'], profit['mean']))
+
+def parse_arguments():
+	parser = ArgumentParser()
+	parser.add_argument('paths', help="Hand history files", nargs='+')
+	return parser.parse_args().paths
+
+if __name__ == '__main__':
+	analyze(parse_arguments())
@@ -3,6 +3,8 @@ from pypokerengine.players import BasePokerPlayer
 from pypokerengine.engine.card import Card
 
 class HandPlayer(BasePokerPlayer):
+    notifications = frozenset()
+
     def __init__(self, epsilon=52000):
         super().__init__()
         self.hand_evaluator = HandEvaluator()
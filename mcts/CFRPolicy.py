@@ -0,0 +1,139 @@
+from state_abstraction import StateAbstraction
+import random as rand
+import json
+import os
+from pypokerengine.utils.shared_loader import load_shared
+
+STREETS = ["preflop", "flop", "turn", "river"]
+
+# abstract buckets of StateAbstraction, the row order of the trainer's arrays
+BUCKETS = {
+	"preflop": ["1", "2", "3", "4", "5", "6", "7", "8"],
+	"flop": [
+		"highCardLow", "highCardHigh", "pairLow", "pairHigh",
+		"twoPairLowLow", "twoPairHighLow", "twoPairHighHigh",
+		"threeLow", "threeHigh", "straightLow", "straightHigh",
+		"straightLow-1F", "straightHigh-1F", "flush", "flush-1F", "flush-2",
+		"fullHouseLowLow", "fullHouseHighLow", "fullHouseHighHigh",
+		"fourLow", "fourHigh", "straightFlush", "straightFlush-1F",
+		"royalFlush", "communityBestF"
+	],
+	"turn": [
+		"highCardLow", "highCardHigh", "pairLow", "pairHigh",
+		"twoPairLowLow", "twoPairHighLow", "twoPairHighHigh",
+		"threeLow", "threeHigh", "straightLow", "straightHigh",
+		"straightLow-1T", "straightHigh-1T", "flush", "flush-1T",
+		"fullHouseLowLow", "fullHouseHighLow", "fullHouseHighHigh",
+		"fourLow", "fourHigh", "straightFlush", "straightFlush-1T",
+		"royalFlush", "communityBestT"
+	],
+	"river": [
+		"highCardLow", "highCardHigh", "pairLow", "pairHigh",
+		"twoPairLowLow", "twoPairHighLow", "twoPairHighHigh",
+		"threeLow", "threeHigh", "straightLow", "straightHigh",
+		"flush", "fullHouseLowLow", "fullHouseHighLow", "fullHouseHighHigh",
+		"fourLow", "fourHigh", "straightFlush", "royalFlush",
+		"communityBestR"
+	]
+}
+
+# same order as the engine's valid_actions
+ACTIONS = ["fold", "call", "raise"]
+ACTION_CODES = {"fold": "f", "call": "c", "raise": "r"}
+ENGINE_ACTION_CODES = {"FOLD": "f", "CALL": "c", "RAISE": "r"}
+
+# same raise caps as MCTSNode.getValidActions
+MAX_RAISES = 4
+MAX_STREET_RAISES = 2
+
+# betting histories are action codes per street joined by "/", eg "rc/cr"
+# the small blind opens every street like in the engine
+
+def getStreet(history):
+	return STREETS[history.count("/")]
+
+def getActingPlayer(history):
+	return len(history.split("/")[-1]) % 2
+
+def getValidActions(history):
+	actions = ["fold", "call"]
+	if history.count("r") < MAX_RAISES and history.split("/")[-1].count("r") < MAX_STREET_RAISES:
+		actions.append("raise")
+	return actions
+
+# history after action and whether the hand goes on, ends with a fold or goes to showdown
+def applyAction(history, action):
+	if action == "fold":
+		return history + "f", "fold"
+
+	if action == "call" and history.split("/")[-1]:
+		# a call that is not the street's first action closes the street
+		if getStreet(history) == "river":
+			return history + "c", "showdown"
+		return history + "c/", "continue"
+
+	return history + ACTION_CODES[action], "continue"
+
+# rebuild the betting history from the engine's round_state
+def historyFromRoundState(roundState):
+	streetHistories = []
+	for street in STREETS:
+		actions = roundState["action_histories"].get(street)
+		if actions is None:
+			break
+		streetHistories.append("".join(ENGINE_ACTION_CODES[a["action"]] for a in actions if a["action"] in ENGINE_ACTION_CODES))
+	return "/".join(streetHistories)
+
+class CFRPolicy:
+	def __init__(self):
+		self.stateAbstractor = StateAbstraction()
+		self.strategies = {}    # {history: {bucket: [fold, call, raise] probabilities}}
+
+	# action probabilities for a history & bucket, None if the policy never reached it
+	def getStrategy(self, history, bucket):
+		return self.strategies.get(history, {}).get(bucket)
+
+	# sample an action from the average strategy
+	def getAction(self, holeCards, communityCards, street, history, rng=rand):
+		bucket = self.stateAbstractor.get_abstract_state(
+			holeCards=holeCards,
+			communityCards=communityCards,
+			street=street
+		)
+
+		strategy = self.getStrategy(history, bucket)
+		if strategy is None:
+			return "call"
+
+		return rng.choices(ACTIONS, weights=strategy)[0]
+
+    # save policy to JSON, indent=None writes a compact file
+	def savetoJSON(self, filename, indent=None):
+		jsonPolicy = {
+			"actions": ACTIONS,
+			"maxRaises": MAX_RAISES,
+			"maxStreetRaises": MAX_STREET_RAISES,
+			"strategies": self.strategies
+		}
+
+		with open(filename, 'w') as f:
+			json.dump(jsonPolicy, f, indent=indent)
+
+		print(f"CFR policy saved to {filename}")
+
+    # load policy from JSON
+	def loadFromJson(filename):
+		if not os.path.exists(filename):
+			raise FileNotFoundError(f"JSON file {filename} not found")
+
+		with open(filename, 'r') as f:
+			jsonPolicy = json.load(f)
+
+		policy = CFRPolicy()
+		policy.strategies = jsonPolicy["strategies"]
+
+		return policy
+
+    # load policy through the process-wide cache of load_shared, the returned policy is shared so treat it as read-only
+	def loadShared(filename):
+		return load_shared(filename, CFRPolicy.loadFromJson)
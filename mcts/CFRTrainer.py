@@ -0,0 +1,230 @@
+""" External sampling MCCFR over the StateAbstraction buckets.
+
+$ PYTHONPATH=. python mcts/CFRTrainer.py -i 100000 -w 8 -o cfr_policy.json
+"""
+from CFRPolicy import CFRPolicy, STREETS, BUCKETS, ACTIONS, getActingPlayer, getStreet, getValidActions, applyAction
+from state_abstraction import StateAbstraction
+from pypokerengine.engine.card import Card
+from pypokerengine.engine.hand_evaluator import HandEvaluator
+from multiprocessing import Pool, RawArray
+from argparse import ArgumentParser
+import numpy as np
+import random as rand
+
+# number of community cards visible on each street
+BOARD_SIZE = {"preflop": 0, "flop": 3, "turn": 4, "river": 5}
+
+# raise size per street in small blinds, like ActionChecker.round_raise_amount
+RAISE_SIZE = {"preflop": 2, "flop": 2, "turn": 4, "river": 4}
+
+# trainer of a pool worker and its view of the parent's regrets, set up once by _setupWorker
+_workerTrainer = None
+_sharedRegrets = None
+
+class CFRTrainer:
+	def __init__(self, plus=True):
+		self.stateAbstractor = StateAbstraction()
+		# floor regrets at zero after every batch (regret matching+)
+		self.plus = plus
+
+		# public betting tree, every decision node owns one row per bucket of its street
+		self.histories = []     # node id -> history
+		self.nodeStreets = []   # node id -> street index
+		self.nodeOffsets = []   # node id -> first row in the arrays
+		self.nodeChildren = []  # node id -> [(action index, child node id or terminal status)]
+		self.buildTree("")
+
+		rows = self.nodeOffsets[-1] + len(BUCKETS[STREETS[self.nodeStreets[-1]]])
+		self.legalMask = np.zeros((rows, len(ACTIONS)))
+		for nodeId, children in enumerate(self.nodeChildren):
+			rowCount = len(BUCKETS[STREETS[self.nodeStreets[nodeId]]])
+			for actionIndex, child in children:
+				self.legalMask[self.nodeOffsets[nodeId]:self.nodeOffsets[nodeId] + rowCount, actionIndex] = 1.0
+
+		self.regrets = np.zeros((rows, len(ACTIONS)))
+		self.strategySums = np.zeros((rows, len(ACTIONS)))
+		self.iterations = 0
+
+	# enumerate decision nodes depth first, returns the node id of history
+	def buildTree(self, history):
+		nodeId = len(self.histories)
+		street = STREETS.index(getStreet(history))
+		offset = self.nodeOffsets[-1] + len(BUCKETS[STREETS[self.nodeStreets[-1]]]) if self.histories else 0
+
+		self.histories.append(history)
+		self.nodeStreets.append(street)
+		self.nodeOffsets.append(offset)
+		self.nodeChildren.append([])
+
+		children = []
+		for action in getValidActions(history):
+			nextHistory, status = applyAction(history, action)
+			child = self.buildTree(nextHistory) if status == "continue" else status
+			children.append((ACTIONS.index(action), child))
+		self.nodeChildren[nodeId] = children
+
+		return nodeId
+
+	# sample cards, return bucket rows per player & street and the showdown result for player 0
+	def sampleDeal(self, rng):
+		cards = [Card.from_id(cardId) for cardId in rng.sample(range(1, 53), 9)]
+		holes = [cards[:2], cards[2:4]]
+		board = cards[4:]
+
+		boardStr = [str(card) for card in board]
+		buckets = []
+		for hole in holes:
+			holeStr = [str(card) for card in hole]
+			buckets.append([
+				BUCKETS[street].index(self.stateAbstractor.get_abstract_state(holeStr, boardStr[:BOARD_SIZE[street]], street))
+				for street in STREETS
+			])
+
+		scores = [HandEvaluator.eval_hand(hole, board) for hole in holes]
+		showdown = (scores[0] > scores[1]) - (scores[0] < scores[1])
+		return buckets, showdown
+
+	# current strategy by regret matching
+	def getStrategy(self, row):
+		positive = np.maximum(self.regrets[row], 0.0) * self.legalMask[row]
+		total = positive.sum()
+		if total > 0:
+			return positive / total
+		return self.legalMask[row] / self.legalMask[row].sum()
+
+	# utility for traverser, every traverser action is explored and the opponent's action is sampled
+	def traverse(self, nodeId, traverser, buckets, showdown, contributions, rng):
+		player = getActingPlayer(self.histories[nodeId])
+		street = self.nodeStreets[nodeId]
+		row = self.nodeOffsets[nodeId] + buckets[player][street]
+		strategy = self.getStrategy(row)
+
+		if player != traverser:
+			self.strategySums[row] += strategy
+			children = self.nodeChildren[nodeId]
+			weights = [strategy[actionIndex] for actionIndex, child in children]
+			actionIndex, child = rng.choices(children, weights=weights)[0]
+			return self.traverseChild(child, actionIndex, nodeId, traverser, player, buckets, showdown, contributions, rng)
+
+		utilities = np.zeros(len(ACTIONS))
+		for actionIndex, child in self.nodeChildren[nodeId]:
+			utilities[actionIndex] = self.traverseChild(child, actionIndex, nodeId, traverser, player, buckets, showdown, contributions, rng)
+
+		value = float(np.dot(strategy, utilities))
+		self.regrets[row] += (utilities - value) * self.legalMask[row]
+		return value
+
+	def traverseChild(self, child, actionIndex, nodeId, traverser, player, buckets, showdown, contributions, rng):
+		action = ACTIONS[actionIndex]
+		opponent = 1 - traverser
+
+		if action == "fold":
+			return -contributions[traverser] if player == traverser else contributions[opponent]
+
+		nextContributions = list(contributions)
+		nextContributions[player] = max(contributions)
+		if action == "raise":
+			nextContributions[player] += RAISE_SIZE[STREETS[self.nodeStreets[nodeId]]]
+
+		if child == "showdown":
+			result = showdown if traverser == 0 else -showdown
+			return result * nextContributions[opponent]
+
+		return self.traverse(child, traverser, buckets, showdown, nextContributions, rng)
+
+	# run iterations in this process, each one traverses the tree once for each player
+	def iterate(self, iterations, rng):
+		for i in range(iterations):
+			buckets, showdown = self.sampleDeal(rng)
+			for traverser in range(2):
+				# small blind posts 1, big blind posts 2
+				self.traverse(0, traverser, buckets, showdown, [1, 2], rng)
+		self.iterations += iterations
+
+	# train in batches, with several workers every worker runs its share of a batch from the same arrays
+	def train(self, iterations, workers=1, batchSize=1000, seed=None):
+		rng = rand.Random(seed)
+		pool = None
+		if workers > 1:
+			# the regrets move to shared memory, so workers read the current ones without pickling them every batch
+			shared = RawArray("d", self.regrets.size)
+			regrets = np.frombuffer(shared).reshape(self.regrets.shape)
+			regrets[:] = self.regrets
+			self.regrets = regrets
+			pool = Pool(workers, initializer=_setupWorker, initargs=(self.plus, shared))
+
+		done = 0
+		while done < iterations:
+			batch = min(batchSize, iterations - done)
+			if pool:
+				shares = [batch // workers + (1 if w < batch % workers else 0) for w in range(workers)]
+				jobs = [(share, rng.getrandbits(32)) for share in shares if share > 0]
+				for rows, regretDelta, strategyDelta in pool.map(_iterateWorker, jobs):
+					self.regrets[rows] += regretDelta
+					self.strategySums[rows] += strategyDelta
+				self.iterations += batch
+			else:
+				self.iterate(batch, rng)
+
+			if self.plus:
+				np.maximum(self.regrets, 0.0, out=self.regrets)
+
+			done += batch
+			print(f"CFR iteration {done}/{iterations}")
+
+		if pool:
+			pool.close()
+			pool.join()
+
+	# normalised average strategy, unvisited rows fall back to uniform over legal actions
+	def getAverageStrategy(self):
+		totals = self.strategySums.sum(axis=1, keepdims=True)
+		uniform = self.legalMask / self.legalMask.sum(axis=1, keepdims=True)
+		return np.where(totals > 0, self.strategySums / np.maximum(totals, 1e-12), uniform)
+
+	def exportPolicy(self):
+		average = self.getAverageStrategy()
+		policy = CFRPolicy()
+
+		for nodeId, history in enumerate(self.histories):
+			street = STREETS[self.nodeStreets[nodeId]]
+			offset = self.nodeOffsets[nodeId]
+			policy.strategies[history] = {
+				bucket: [round(float(p), 4) for p in average[offset + index]]
+				for index, bucket in enumerate(BUCKETS[street])
+			}
+
+		return policy
+
+def _setupWorker(plus, sharedRegrets):
+	global _workerTrainer, _sharedRegrets
+	_workerTrainer = CFRTrainer(plus)
+	_sharedRegrets = np.frombuffer(sharedRegrets).reshape(_workerTrainer.regrets.shape)
+
+# runs a share of a batch from the current regrets, returns the rows it changed and their updates
+def _iterateWorker(job):
+	iterations, seed = job
+	trainer = _workerTrainer
+	trainer.regrets[:] = _sharedRegrets
+	trainer.strategySums[:] = 0.0
+	trainer.iterate(iterations, rand.Random(seed))
+
+	regretDelta = trainer.regrets - _sharedRegrets
+	rows = np.flatnonzero(regretDelta.any(axis=1) | trainer.strategySums.any(axis=1))
+	return rows, regretDelta[rows], trainer.strategySums[rows]
+
+def parse_arguments():
+	parser = ArgumentParser()
+	parser.add_argument('-i', '--iterations', help="Sampled deals to train on", default=100000, type=int)
+	parser.add_argument('-w', '--workers', help="Worker processes", default=1, type=int)
+	parser.add_argument('-b', '--batch', help="Deals per synchronisation batch", default=1000, type=int)
+	parser.add_argument('-s', '--seed', help="Seed for the sampled deals", default=None, type=int)
+	parser.add_argument('-o', '--output', help="Output JSON file", default="cfr_policy.json", type=str)
+	parser.add_argument('--vanilla', help="Keep negative regrets instead of regret matching+", action='store_true')
+	return parser.parse_args()
+
+if __name__ == '__main__':
+	args = parse_arguments()
+	trainer = CFRTrainer(plus=not args.vanilla)
+	trainer.train(args.iterations, args.workers, args.batch, args.seed)
+	trainer.exportPolicy().savetoJSON(args.output)
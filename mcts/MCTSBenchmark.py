@@ -0,0 +1,177 @@
+""" Convergence report for trained MCTS tree checkpoints.
+
+$ PYTHONPATH=. python mcts/MCTSBenchmark.py trained_mcts_tree150.json trained_mcts_tree500.json -d 500
+"""
+from MCTSTree import MCTSTree
+from AI13Player import AI13Player
+from pypokerengine.engine.dealer import Dealer
+from pypokerengine.api.game import play_dealt_round
+from argparse import ArgumentParser
+import random as rand
+import statistics
+import math
+
+# first node below the root where a player acts
+def getDecisionNode(tree):
+	node = tree.root
+	while node.isNature and node.children:
+		node = next(iter(node.children.values()))
+	return node
+
+# average value of every explored action at node
+def getActionValues(node):
+	return {action: child.value / child.visits for action, child in node.children.items() if child.visits > 0}
+
+# keep searching a copy of the tree and record how much the decision node's action values still move
+def measureConvergence(treeFile, playouts=20000, checkpoints=10):
+	tree = MCTSTree.loadFromJson(treeFile)
+	step = max(1, playouts // checkpoints)
+
+	startVisits = getDecisionNode(tree).visits
+	history = [getActionValues(getDecisionNode(tree))]
+	drift = []
+	for i in range(checkpoints):
+		tree.search(step)
+		values = getActionValues(getDecisionNode(tree))
+
+		# largest change of any action value since the last checkpoint
+		previous = history[-1]
+		drift.append(max((abs(value - previous.get(action, 0.0)) for action, value in values.items()), default=0.0))
+		history.append(values)
+
+	# a few playouts barely move the averages of a node that already has millions of visits
+	addedVisits = getDecisionNode(tree).visits - startVisits
+	return {
+		"playoutsPerCheckpoint": step, "actionValues": history[-1], "drift": drift,
+		"addedVisitShare": addedVisits / startVisits if startVisits else 1.0
+	}
+
+# children of nodeA and nodeB to compare, and whether a nature layer was stepped through
+# children are matched by key, which under nature nodes includes the dealt state. Checkpoints are
+# usually trained from different deals, when two nature nodes share no state their most visited
+# states are compared instead
+def matchedChildren(nodeA, nodeB):
+	pairs = [(childA, nodeB.children[key]) for key, childA in nodeA.children.items()
+		if key in nodeB.children and childA.street == nodeB.children[key].street]
+	if pairs or not (nodeA.isNature and nodeA.children and nodeB.children):
+		return pairs, False
+
+	mostVisitedA = max(nodeA.children.values(), key=lambda child: child.visits)
+	mostVisitedB = max(nodeB.children.values(), key=lambda child: child.visits)
+	return [(mostVisitedA, mostVisitedB)], True
+
+# best action of every decision node two trees share
+def comparePolicies(treeA, treeB):
+	compared, changed = 0, 0
+	visits, changedVisits = 0, 0
+	steppedNature = 0
+
+	stack = [(treeA.root, treeB.root)]
+	while stack:
+		nodeA, nodeB = stack.pop()
+
+		valuesA, valuesB = getActionValues(nodeA), getActionValues(nodeB)
+		if not nodeA.isNature and valuesA and valuesB:
+			compared += 1
+			visits += nodeB.visits
+			if max(valuesA, key=valuesA.get) != max(valuesB, key=valuesB.get):
+				changed += 1
+				changedVisits += nodeB.visits
+
+		pairs, stepped = matchedChildren(nodeA, nodeB)
+		steppedNature += stepped
+		stack.extend(pairs)
+
+	return {
+		"comparedNodes": compared,
+		"steppedNatureNodes": steppedNature,
+		"changeRate": changed / compared if compared else 0.0,
+		"visitWeightedChangeRate": changedVisits / visits if visits else 0.0
+	}
+
+# duplicate match: every deal is played twice with the seats swapped, so card luck cancels out
+def headToHead(playerA, playerB, deals=500, smallBlind=20, stack=10000, seed=None):
+	rng = rand.Random(seed)
+	bigBlind = smallBlind * 2
+
+	dealer = Dealer(smallBlind, stack)
+	dealer.register_player("A", playerA)
+	dealer.register_player("B", playerB)
+	seats = list(dealer.table.seats.players)
+	uuidA = seats[0].uuid
+
+	# mbb per hand of A for every duplicate pair
+	results = []
+	for deal in range(deals):
+		deckIds = rng.sample(range(1, 53), 52)
+		won = 0
+		for players in (seats, seats[::-1]):
+			won += play_dealt_round(dealer, list(players), deckIds, deal + 1, stack)[uuidA]
+		results.append(1000.0 * won / bigBlind / 2)
+
+	# players that act the same on a deal draw its duplicate pair exactly
+	decisivePairs = sum(1 for result in results if result != 0)
+	mean = statistics.mean(results)
+	stdev = statistics.stdev(results) if len(results) > 1 else 0.0
+	return {
+		"deals": deals,
+		"mbbPerHand": mean,
+		"confidence95": 1.96 * stdev / math.sqrt(len(results)),
+		"pairsWon": sum(1 for result in results if result > 0) / len(results),
+		"decisivePairs": decisivePairs
+	}
+
+# full report for a sequence of checkpoints, oldest first
+def benchmark(treeFiles, playouts=20000, checkpoints=10, deals=500, seed=None):
+	report = {"trees": {}, "pairs": []}
+
+	for treeFile in treeFiles:
+		report["trees"][treeFile] = measureConvergence(treeFile, playouts, checkpoints)
+
+	for older, newer in zip(treeFiles, treeFiles[1:]):
+		pair = {"older": older, "newer": newer}
+		pair.update(comparePolicies(MCTSTree.loadFromJson(older), MCTSTree.loadFromJson(newer)))
+		pair["headToHead"] = headToHead(AI13Player(newer), AI13Player(older), deals, seed=seed) if deals > 0 else None
+		report["pairs"].append(pair)
+
+	return report
+
+# minShare is the share of the decision node's visits the extra playouts must add for the drift to tell anything
+def printReport(report, tolerance=0.01, minShare=0.01):
+	for treeFile, convergence in report["trees"].items():
+		values = ", ".join(f"{action}={value:+.3f}" for action, value in sorted(convergence["actionValues"].items()))
+		lastDrift = convergence["drift"][-1] if convergence["drift"] else 0.0
+		share = convergence["addedVisitShare"]
+		if share < minShare:
+			status = f"inconclusive, the playouts added only {share:.2%} to the node's visits"
+		else:
+			status = "converged" if lastDrift < tolerance else "still moving"
+		print(f"{treeFile}: {values} | drift {lastDrift:.4f} per {convergence['playoutsPerCheckpoint']} playouts ({status})")
+
+	for pair in report["pairs"]:
+		line = f"{pair['older']} -> {pair['newer']}: policy changed at {pair['changeRate']:.1%} of {pair['comparedNodes']} nodes"
+		line += f" ({pair['visitWeightedChangeRate']:.1%} by visits)"
+		if pair["steppedNatureNodes"]:
+			line += f", {pair['steppedNatureNodes']} nature nodes had no dealt state in common"
+		result = pair["headToHead"]
+		if result:
+			line += f" | newer {result['mbbPerHand']:+.1f} +/- {result['confidence95']:.1f} mbb/hand over {result['deals']} duplicate deals"
+			if result["decisivePairs"] == 0:
+				line += " (the trees played every deal the same way)"
+		print(line)
+
+def parse_arguments():
+	parser = ArgumentParser()
+	parser.add_argument('trees', help="Tree checkpoints, oldest first", nargs='+')
+	parser.add_argument('-p', '--playouts', help="Extra playouts per tree for the convergence check", default=20000, type=int)
+	parser.add_argument('-c', '--checkpoints', help="Convergence checkpoints", default=10, type=int)
+	parser.add_argument('-d', '--deals', help="Duplicate deals per head-to-head match", default=500, type=int)
+	parser.add_argument('-s', '--seed', help="Seed for the dealt cards", default=None, type=int)
+	parser.add_argument('-t', '--tolerance', help="Drift below which a tree counts as converged", default=0.01, type=float)
+	parser.add_argument('-m', '--min-share', help="Share of the decision node's visits the extra playouts must add", default=0.01, type=float)
+	return parser.parse_args()
+
+if __name__ == '__main__':
+	args = parse_arguments()
+	report = benchmark(args.trees, args.playouts, args.checkpoints, args.deals, args.seed)
+	printReport(report, args.tolerance, args.min_share)
@@ -1,8 +1,10 @@
 from state_abstraction import StateAbstraction
+from RolloutPolicy import RandomRolloutPolicy
 import random as rand
 import math
 import json
 import os
+from pypokerengine.utils.shared_loader import load_shared
 
 class MCTSNode:
 	def __init__(self, state, parent=None, action=None, isNature=False, isOpponent=False, street="preflop"):
@@ -36,9 +38,13 @@ class MCTSNode:
 		if parent and parent.street != street:
 			self.streetRaiseCount = 0
 
+    # key of a child in self.children, nature can lead to several abstract states so its children are keyed by state too
+	def childKey(self, action, state):
+		return f"{action}:{state}" if self.isNature else action
+
     # check if we have tried all actions from this state
 	def isFullyExpanded(self):
-		return len(self.children) == len(self.getValidActions())
+		return len({child.action for child in self.children.values()}) == len(self.getValidActions())
 	
     # return child w highest UCB score
 	def getBestChild(self, explorationWeight=160.0):
@@ -138,10 +144,14 @@ class MCTSNode:
 		return jsonDict
 
 class MCTSTree:
-	def __init__(self):
+	def __init__(self, rolloutPolicy=None, rng=None):
 		self.stateAbstractor = StateAbstraction()
 		self.root = MCTSNode(state="root", isNature=True)
 		self.maxSimulationDepth = 20
+		# random source for expansion & nature, pass a seeded random.Random for reproducible training
+		self.rng = rng if rng else rand
+		# picks playout actions & scores playouts in simulate
+		self.rolloutPolicy = rolloutPolicy if rolloutPolicy else RandomRolloutPolicy(self.rng)
 	
     # do MCTS
 	def search(self, iterations=1000):
@@ -194,15 +204,15 @@ class MCTSTree:
 		possibleActions = node.getValidActions()
 		
 		# remove actions that already have children
-		for action in list(node.children.keys()):
-			if action in possibleActions:
-				possibleActions.remove(action)
+		for child in node.children.values():
+			if child.action in possibleActions:
+				possibleActions.remove(child.action)
 		
 		if not possibleActions:
 			return node
 		
 		# choose a random action that hasnt been tried
-		action = rand.choice(possibleActions)
+		action = self.rng.choice(possibleActions)
 		
 		# determine the next state and street
 		nextState, nextStreet, isNatureNext, isOpponentNext = self.getNextState(node, action)
@@ -218,7 +228,7 @@ class MCTSTree:
 		)
 		
 		# add child to parent's children dictionary
-		node.children[action] = childNode
+		node.children[node.childKey(action, nextState)] = childNode
 		
 		return childNode
 	
@@ -237,7 +247,7 @@ class MCTSTree:
 			# transition to a preflop state
 			if node.street == "preflop":
 				# after preflop wqe are in numbered abstract state (1-8)
-				nextState = str(rand.randint(1, 8))
+				nextState = str(self.rng.randint(1, 8))
 				isOpponentNext = True
 
             # transition to a flop state
@@ -251,7 +261,7 @@ class MCTSTree:
 					"fourLow", "fourHigh", "straightFlush", "straightFlush-1F",
 					"royalFlush", "communityBestF"
 				]
-				nextState = rand.choice(possibleFlopStates)
+				nextState = self.rng.choice(possibleFlopStates)
 				isOpponentNext = True
 
 			# transition to a flop state
@@ -265,7 +275,7 @@ class MCTSTree:
 					"fourLow", "fourHigh", "straightFlush", "straightFlush-1T",
 					"royalFlush", "communityBestT"
 				]
-				nextState = rand.choice(possibleTurnStates)
+				nextState = self.rng.choice(possibleTurnStates)
 				isOpponentNext = True
 
 			# transition to a river state
@@ -278,7 +288,7 @@ class MCTSTree:
 					"fourLow", "fourHigh", "straightFlush", "royalFlush", 
 					"communityBestR"
 				]
-				nextState = rand.choice(possibleRiverStates)
+				nextState = self.rng.choice(possibleRiverStates)
 				isOpponentNext = True
 
         # our turn after opp
@@ -312,7 +322,7 @@ class MCTSTree:
 		
 		return nextState, nextStreet, isNatureNext, isOpponentNext
 	
-    # sim rand movwes from node
+    # play out from node with the rollout policy
 	def simulate(self, node):
 		currentNode = node
 		depth = 0
@@ -323,7 +333,7 @@ class MCTSTree:
 			if possibleActions == False:
 				break
 			
-			action = rand.choice(possibleActions)
+			action = self.rolloutPolicy.chooseAction(currentNode, possibleActions)
 			nextState, nextStreet, isNatureNext, isOpponentNext = self.getNextState(currentNode, action)
 			
 			nextNode = MCTSNode(
@@ -338,12 +348,8 @@ class MCTSTree:
 			currentNode = nextNode
 			depth += 1
 		
-		# if terminal return reward
-		if currentNode.isTerminal():
-			return currentNode.getReward()
-		
-		# else estimate reward
-		return currentNode.getHandStrength() * 2 - 1  # scale from [0,1] to [-1,1]
+		# reward of the terminal node, or an estimate if we hit the depth limit
+		return self.rolloutPolicy.evaluate(currentNode)
 	
     # updates stats for nodes in path
 	def backpropagate(self, node, reward):
@@ -388,17 +394,17 @@ class MCTSTree:
 		return bestAction if bestAction else "call"
 
 	
-    # save tree to JSON
-	def savetoJSON(self, filename):
+    # save tree to JSON, indent=None writes a compact file
+	def savetoJSON(self, filename, indent=2):
 		# create a dictionary to store all nodes
 		nodes = {}
 		nodeToId = {}
 		nextId = 0
 		
 		# perform a breadth-first traversal to assign IDs and build the JSON structure
-		queue = [(self.root, None)]  # (node, parentId)
+		queue = [(self.root, None, None)]  # (node, parentId, key in parent's children)
 		while queue:
-			node, parentId = queue.pop(0)
+			node, parentId, key = queue.pop(0)
 			
 			# assign an ID to this node
 			nodeId = str(nextId)
@@ -411,11 +417,11 @@ class MCTSTree:
 			# update the parent's children arr
 			if parentId is not None:
 				parentNode = nodes[parentId]
-				parentNode["children"][node.action] = nodeId
+				parentNode["children"][key] = nodeId
 			
 			# add children to the queue
-			for action, childNode in node.children.items():
-				queue.append((childNode, nodeId))
+			for childKey, childNode in node.children.items():
+				queue.append((childNode, nodeId, childKey))
 		
 		# create the final JSON structure
 		jsonTree = {
@@ -426,7 +432,7 @@ class MCTSTree:
 		
 		# write to JSON file
 		with open(filename, 'w') as f:
-			json.dump(jsonTree, f, indent=2)
+			json.dump(jsonTree, f, indent=indent)
 		
 		print(f"MCTS tree saved to {filename}")
 	
@@ -468,20 +474,24 @@ class MCTSTree:
 		for nodeId, nodeData in jsonTree["nodes"].items():
 			node = nodeDict[nodeId]
 			
-			# connect children
-			for action, childId in nodeData["children"].items():
+			# connect children, older files key nature children by action alone
+			for childId in nodeData["children"].values():
 				childNode = nodeDict[childId]
 				childNode.parent = node
-				node.children[action] = childNode
+				node.children[node.childKey(childNode.action, childNode.state)] = childNode
 		
 		# set the root
 		tree.root = nodeDict[jsonTree["root"]]
 		
 		return tree
+	
+    # load tree through the process-wide cache of load_shared, the returned tree is shared so treat it as read-only
+	def loadShared(filename):
+		return load_shared(filename, MCTSTree.loadFromJson)
 
-def trainMCTS(iterations=10000, simulationsPerIteration=100):
+def trainMCTS(iterations=10000, simulationsPerIteration=100, rolloutPolicy=None, seed=None):
 	# train an MCTS tree
-	tree = MCTSTree()
+	tree = MCTSTree(rolloutPolicy, rand.Random(seed) if seed is not None else None)
 	
 	for i in range(iterations):
 		if i % 100 == 0:
@@ -0,0 +1,100 @@
+""" Merge and prune trained MCTS trees.
+
+$ PYTHONPATH=. python mcts/MCTSTreeTools.py -o merged.json -m 50 trained_mcts_tree500.json trained_mcts_tree2000.json
+"""
+from MCTSTree import MCTSTree
+from argparse import ArgumentParser
+
+# two nodes describe the same game position if the action path and abstract state agree
+def isSameNode(nodeA, nodeB):
+	return nodeA.action == nodeB.action and nodeA.state == nodeB.state and nodeA.street == nodeB.street
+
+# add visits & values of source subtree onto target subtree
+# children are matched by action and resulting state, states only one tree sampled under a nature node become siblings
+def mergeNodes(target, source):
+	if not isSameNode(target, source):
+		raise ValueError(f"cannot merge node {source.action}/{source.state} into {target.action}/{target.state}")
+
+	for sourceChild in source.children.values():
+		key = target.childKey(sourceChild.action, sourceChild.state)
+		targetChild = target.children.get(key)
+
+		if targetChild is not None:
+			mergeNodes(targetChild, sourceChild)
+
+		# players' actions never change the abstract state, so only nature can lead to an unknown one
+		elif not target.isNature and any(child.action == sourceChild.action for child in target.children.values()):
+			raise ValueError(f"trees disagree on the state after {sourceChild.action}: {sourceChild.state} is not in the target tree")
+
+		# new action path or nature state, adopt the whole subtree
+		else:
+			sourceChild.parent = target
+			target.children[key] = sourceChild
+
+	# every source child is merged or adopted by now, so all of source's playouts are under target
+	target.visits += source.visits
+	target.value += source.value
+
+# merge several trees into one, the source trees are consumed
+def mergeTrees(trees):
+	if not trees:
+		raise ValueError("need at least one tree to merge")
+
+	merged = trees[0]
+	for tree in trees[1:]:
+		mergeNodes(merged.root, tree.root)
+		merged.maxSimulationDepth = max(merged.maxSimulationDepth, tree.maxSimulationDepth)
+
+	return merged
+
+# remove every subtree whose top node has fewer than minVisits visits, returns number of removed nodes
+def pruneTree(tree, minVisits):
+	removed = 0
+	stack = [tree.root]
+	while stack:
+		node = stack.pop()
+		for action in list(node.children.keys()):
+			child = node.children[action]
+			if child.visits < minVisits:
+				removed += countNodes(child)
+				del node.children[action]
+			else:
+				stack.append(child)
+
+	return removed
+
+# number of nodes in the subtree below node (inclusive)
+def countNodes(node):
+	count = 0
+	stack = [node]
+	while stack:
+		node = stack.pop()
+		count += 1
+		stack.extend(node.children.values())
+
+	return count
+
+def loadTrees(filenames):
+	return [MCTSTree.loadFromJson(filename) for filename in filenames]
+
+def parse_arguments():
+	parser = ArgumentParser()
+	parser.add_argument('trees', help="Trained tree JSON files", nargs='+')
+	parser.add_argument('-o', '--output', help="Output JSON file", default="merged_mcts_tree.json", type=str)
+	parser.add_argument('-m', '--min_visits', help="Prune nodes with fewer visits", default=0, type=int)
+	parser.add_argument('--pretty', help="Indent the output file", action='store_true')
+	return parser.parse_args()
+
+if __name__ == '__main__':
+	args = parse_arguments()
+
+	trees = loadTrees(args.trees)
+	inputNodes = sum(countNodes(tree.root) for tree in trees)
+
+	tree = mergeTrees(trees)
+	mergedNodes = countNodes(tree.root)
+
+	removed = pruneTree(tree, args.min_visits) if args.min_visits > 0 else 0
+
+	print(f"merged {len(trees)} trees: {inputNodes} -> {mergedNodes} nodes, pruned {removed} nodes")
+	tree.savetoJSON(args.output, indent=2 if args.pretty else None)
@@ -0,0 +1,129 @@
+from state_abstraction import StateAbstraction
+from pypokerengine.engine.card import Card
+from pypokerengine.engine.hand_evaluator import HandEvaluator
+import random as rand
+import math
+
+STREETS = ["preflop", "flop", "turn", "river"]
+
+# number of community cards visible on each street
+BOARD_SIZE = {"preflop": 0, "flop": 3, "turn": 4, "river": 5}
+
+# showdown equity of every abstract bucket against a random hand
+# generated with computeBucketEquities(samples=200000)
+BUCKET_EQUITIES = {
+	"preflop": {
+		"1": 0.45, "2": 0.457, "3": 0.572, "4": 0.585,
+		"5": 0.59, "6": 0.605, "7": 0.618, "8": 0.691
+	},
+	"flop": {
+		"communityBestF": 0.353, "flush": 0.911, "flush-2": 0.435, "fourHigh": 1.0,
+		"fourLow": 1.0, "fullHouseHighHigh": 1.0, "fullHouseHighLow": 0.971, "fullHouseLowLow": 0.904,
+		"highCardHigh": 0.415, "highCardLow": 0.294, "pairHigh": 0.779, "pairLow": 0.61,
+		"straightFlush": 1.0, "straightFlush-1F": 0.664, "straightHigh": 0.898, "straightHigh-1F": 0.563,
+		"straightLow": 0.798, "straightLow-1F": 0.542, "threeHigh": 0.941, "threeLow": 0.929,
+		"twoPairHighHigh": 0.829, "twoPairHighLow": 0.781, "twoPairLowLow": 0.725
+	},
+	"turn": {
+		"communityBestT": 0.308, "flush": 0.888, "fourHigh": 1.0, "fourLow": 1.0,
+		"fullHouseHighHigh": 0.944, "fullHouseHighLow": 0.928, "fullHouseLowLow": 0.904, "highCardHigh": 0.342,
+		"highCardLow": 0.189, "pairHigh": 0.758, "pairLow": 0.57, "royalFlush": 1.0,
+		"straightFlush": 1.0, "straightFlush-1T": 0.624, "straightHigh": 0.881, "straightHigh-1T": 0.369,
+		"straightLow": 0.691, "straightLow-1T": 0.386, "threeHigh": 0.929, "threeLow": 0.919,
+		"twoPairHighHigh": 0.814, "twoPairHighLow": 0.753, "twoPairLowLow": 0.692
+	},
+	"river": {
+		"communityBestR": 0.238, "flush": 0.892, "fourHigh": 1.0, "fourLow": 1.0,
+		"fullHouseHighHigh": 0.925, "fullHouseHighLow": 0.929, "fullHouseLowLow": 0.919, "highCardHigh": 0.234,
+		"highCardLow": 0.0, "pairHigh": 0.73, "pairLow": 0.506, "royalFlush": 1.0,
+		"straightFlush": 0.984, "straightHigh": 0.903, "straightLow": 0.586, "threeHigh": 0.924,
+		"threeLow": 0.912, "twoPairHighHigh": 0.802, "twoPairHighLow": 0.736, "twoPairLowLow": 0.659
+	}
+}
+
+# estimate the showdown equity of every abstract bucket on every street by sampling random deals
+def computeBucketEquities(samples=200000, rng=rand):
+	stateAbstractor = StateAbstraction()
+	wins = {street: {} for street in STREETS}
+	counts = {street: {} for street in STREETS}
+
+	for i in range(samples):
+		cards = [Card.from_id(cardId) for cardId in rng.sample(range(1, 53), 9)]
+		holeCards, board, opponentCards = cards[:2], cards[2:7], cards[7:]
+
+		# score the full runout once, every street of this deal shares the result
+		myScore = HandEvaluator.eval_hand(holeCards, board)
+		opponentScore = HandEvaluator.eval_hand(opponentCards, board)
+		result = 1.0 if myScore > opponentScore else 0.5 if myScore == opponentScore else 0.0
+
+		holeStr = [str(card) for card in holeCards]
+		boardStr = [str(card) for card in board]
+		for street in STREETS:
+			bucket = stateAbstractor.get_abstract_state(holeStr, boardStr[:BOARD_SIZE[street]], street)
+			wins[street][bucket] = wins[street].get(bucket, 0.0) + result
+			counts[street][bucket] = counts[street].get(bucket, 0) + 1
+
+	return {
+		street: {bucket: round(wins[street][bucket] / counts[street][bucket], 3) for bucket in sorted(counts[street])}
+		for street in STREETS
+	}
+
+class RandomRolloutPolicy:
+	# uniform random playouts scored with the fixed hand strength table, the original MCTSTree behaviour
+
+	def __init__(self, rng=None):
+		self.rng = rng if rng else rand
+
+	# pick the action to play from node during a playout
+	def chooseAction(self, node, actions):
+		return self.rng.choice(actions)
+
+	# reward in [-1, 1] for the node a playout stopped at
+	def evaluate(self, node):
+		if node.isTerminal():
+			return node.getReward()
+		return node.getHandStrength() * 2 - 1
+
+class BucketEquityRolloutPolicy(RandomRolloutPolicy):
+	# playouts where both players bet according to the equity of their bucket
+
+	def __init__(self, equities=None, aggression=8.0, rng=None):
+		super().__init__(rng)
+		self.equities = equities if equities else BUCKET_EQUITIES
+		# how sharply action probabilities follow equity, 0 plays like the random policy
+		self.aggression = aggression
+
+	# our showdown equity at node
+	def getEquity(self, node):
+		if node.street == "showdown":
+			street = "river"
+		# nature nodes still hold the abstract state of the street that just finished
+		elif node.isNature and node.street != "preflop":
+			street = STREETS[STREETS.index(node.street) - 1]
+		else:
+			street = node.street
+
+		equity = self.equities.get(street, {}).get(node.state)
+		return equity if equity is not None else node.getHandStrength()
+
+	def chooseAction(self, node, actions):
+		if node.isNature:
+			return "deal"
+
+		# the opponent's cards are unknown, let it play like an average hand
+		equity = 0.5 if node.isOpponent else self.getEquity(node)
+		strength = self.aggression * (equity - 0.5)
+
+		weights = {"raise": math.exp(strength), "call": 1.0, "fold": 0.5 * math.exp(-strength)}
+		actionWeights = [weights[action] for action in actions]
+		return self.rng.choices(actions, weights=actionWeights)[0]
+
+	def evaluate(self, node):
+		# folds keep the tree's reward so values stay comparable with randomly trained trees
+		if node.action == "fold":
+			return node.getReward()
+
+		return self.getEquity(node) * 2 - 1
+
+if __name__ == '__main__':
+	print(computeBucketEquities())
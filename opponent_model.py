@@ -0,0 +1,117 @@
+import numpy as np
+
+from pypokerengine.engine.card import Card
+from pypokerengine.utils.range_equity import HOLE_COMBOS
+from state_abstraction import StateAbstraction
+
+STREETS = ["preflop", "flop", "turn", "river"]
+ACTIONS = ["fold", "call", "raise"]
+MAX_RAISE_DEPTH = 4   # raises before the action on its street, more are counted as 4
+
+def preflop_percentiles():
+    """Strength percentile in [0, 1) of every hole combo, by the StateAbstraction preflop
+    bucket and then by the card ranks, 1 for the strongest hands."""
+    abstraction = StateAbstraction()
+    strength = []
+    for id1, id2 in HOLE_COMBOS:
+        card1, card2 = Card.from_id(int(id1)), Card.from_id(int(id2))
+        bucket = int(abstraction.pre_flop_abstraction([str(card1), str(card2)]))
+        high, low = max(card1.rank, card2.rank), min(card1.rank, card2.rank)
+        strength.append(bucket * 1000 + high * 15 + low + 0.5 * (card1.suit == card2.suit))
+    strength = np.array(strength)
+    # combos of equal strength share the mean of their ranks
+    values, inverse, counts = np.unique(strength, return_inverse=True, return_counts=True)
+    mean_rank = np.cumsum(counts) - (counts + 1) / 2.0
+    return mean_rank[inverse] / len(strength)
+
+class OpponentModel(object):
+    """Decayed fold/call/raise frequencies of each opponent by street and raise depth.
+
+    Feed it every game update message with observe(action, round_state). Each
+    observation costs O(1): instead of decaying every counter, the weight of new
+    observations grows by 1 / decay, which keeps the same ratios between counters.
+
+    The current hand's range of an opponent starts as every hand and narrows to the
+    top P(raise) of it on a raise and the top P(raise) + P(call) on a call, with
+    the frequencies the model predicted for that spot. range_weights() turns it
+    into per combo weights (by preflop strength) for RangeEquity.equity.
+    """
+
+    PRIOR = (1.0, 2.0, 1.0)   # pseudo counts of fold, call, raise in every spot
+    MIN_RANGE = 0.05          # the range never narrows below this share of hands
+    OUT_OF_RANGE_WEIGHT = 0.05
+
+    def __init__(self, uuid=None, decay=0.995):
+        self.uuid = uuid     # own uuid, our actions only count for the raise depth
+        self.decay = decay
+        self.counters = {}   # opponent uuid -> (street, depth, action) array
+        self.ranges = {}     # opponent uuid -> share of hands still in range this hand
+        self.__weight = 1.0
+        self.__round_count = None
+        self.__street = None
+        self.__raise_depth = 0
+        self.__percentiles = None
+        self.__weights_cache = {}
+
+    def set_uuid(self, uuid):
+        self.uuid = uuid
+
+    def observe(self, action, round_state):
+        """Count an action of a game update message (receive_game_update_message arguments)"""
+        street = STREETS.index(round_state["street"])
+        new_round = round_state["round_count"] != self.__round_count
+        if new_round:
+            self.__round_count = round_state["round_count"]
+            self.ranges = {}
+        if new_round or street != self.__street:
+            self.__street = street
+            self.__raise_depth = 0
+
+        uuid, action_name = action["player_uuid"], action["action"]
+        if uuid != self.uuid and action_name in ACTIONS:
+            self.__observe_opponent(uuid, street, ACTIONS.index(action_name))
+        if action_name == "raise":
+            self.__raise_depth += 1
+
+    def action_frequencies(self, uuid, street, raise_depth=None):
+        """{action: probability} of the opponent in a spot, by default the current raise depth"""
+        depth = min(self.__raise_depth if raise_depth is None else raise_depth, MAX_RAISE_DEPTH)
+        street = STREETS.index(street) if isinstance(street, str) else street
+        counts = self.__counters_of(uuid)[street, depth] / self.__weight + self.PRIOR
+        return dict(zip(ACTIONS, (counts / counts.sum()).tolist()))
+
+    def range_share(self, uuid):
+        return self.ranges.get(uuid, 1.0)
+
+    def range_weights(self, uuid):
+        """Weight of every combo of HOLE_COMBOS in the opponent's current range"""
+        share = round(self.range_share(uuid), 3)
+        if share not in self.__weights_cache:
+            if self.__percentiles is None: self.__percentiles = preflop_percentiles()
+            in_range = self.__percentiles >= 1.0 - share
+            self.__weights_cache[share] = np.where(in_range, 1.0, self.OUT_OF_RANGE_WEIGHT)
+        return self.__weights_cache[share]
+
+    def __observe_opponent(self, uuid, street, action):
+        frequencies = self.action_frequencies(uuid, street)
+        if action == 2:
+            self.__narrow_range(uuid, frequencies["raise"])
+        elif action == 1:
+            self.__narrow_range(uuid, frequencies["raise"] + frequencies["call"])
+
+        self.__weight /= self.decay
+        if self.__weight > 1e100: self.__rescale()
+        self.__counters_of(uuid)[street, min(self.__raise_depth, MAX_RAISE_DEPTH), action] += self.__weight
+
+    def __narrow_range(self, uuid, kept_share):
+        self.ranges[uuid] = max(self.range_share(uuid) * kept_share, self.MIN_RANGE)
+
+    def __counters_of(self, uuid):
+        if uuid not in self.counters:
+            self.counters[uuid] = np.zeros((len(STREETS), MAX_RAISE_DEPTH + 1, len(ACTIONS)))
+        return self.counters[uuid]
+
+    def __rescale(self):
+        for counters in self.counters.values():
+            counters /= self.__weight
+        self.__weight = 1.0
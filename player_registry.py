@@ -0,0 +1,40 @@
+""" Agents testperf.py and sprtperf.py can play, by name.
+
+Classes are imported only when an agent is built, so running one agent does not
+need the dependencies (or the sys.path entries) of all the others.
+"""
+import importlib
+import os
+
+""" =========== *Remember to register your agent!!! =========== """
+# agent name -> (module, class name)
+PLAYER_CLASSES = {
+	'RandomPlayer': ('randomplayer', 'RandomPlayer'),
+	'RaisedPlayer': ('raise_player', 'RaisedPlayer'),
+	'PokerBotPlayer': ('pokerBotPlayer', 'PokerBotPlayer'),
+	'AI13Player': ('AI13Player', 'AI13Player'),
+	'HandPlayer': ('hand_player', 'HandPlayer'),
+	'CFRPlayer': ('CFRPlayer', 'CFRPlayer')
+	# 'SmartWarrior': ('smartwarrior', 'SmartWarrior')
+}
+""" ========================================================= """
+
+# CFRPlayer's default policy, it is not shipped and has to be trained with mcts/CFRTrainer.py
+CFR_POLICY_FILE = "cfr_policy.json"
+
+# names of the agents that can play, CFRPlayer only once its policy is trained
+def player_names():
+	return [name for name in PLAYER_CLASSES if name != 'CFRPlayer' or os.path.exists(CFR_POLICY_FILE)]
+
+# new player for an agent name, or for remote:module:ClassName which runs the class in its own process
+def make_player(name):
+	if name.startswith("remote:"):
+		from pypokerengine.api.remote_player import RemotePlayer
+		return RemotePlayer(name[len("remote:"):])
+	if name == 'CFRPlayer' and not os.path.exists(CFR_POLICY_FILE):
+		raise ValueError("CFRPlayer needs a trained policy in %s, train one with: PYTHONPATH=. python mcts/CFRTrainer.py -o %s" % (CFR_POLICY_FILE, CFR_POLICY_FILE))
+	if name not in PLAYER_CLASSES:
+		raise ValueError("Unknown agent %s, choose one of %s or remote:module:ClassName" % (name, ", ".join(player_names())))
+
+	module, class_name = PLAYER_CLASSES[name]
+	return getattr(importlib.import_module(module), class_name)()
@@ -1,10 +1,12 @@
 from pypokerengine.players import BasePokerPlayer
 from time import sleep
-import random as rand
 import pprint
 
 class PokerBotPlayer(BasePokerPlayer):
 
+  # only game_start_message is read (printed), the other receive_* methods do nothing
+  notifications = frozenset(["game_start_message"])
+
   # initialize hand counter to track the number of hands played
   def __init__(self):
     self.hand_count = 0
@@ -232,7 +234,7 @@ class PokerBotPlayer(BasePokerPlayer):
   # basic bluffing function that randomly bluffs every 20 hands
   def basic_bluff(self, valid_actions):
       if self.hand_count % 2 == 0:
-          if rand.random() < .7:  # 70% chance to bluff, we may change this
+          if self.rng.random() < .7:  # 70% chance to bluff, we may change this
               for action in valid_actions:
                   if action["action"] == "raise":
                       return action  
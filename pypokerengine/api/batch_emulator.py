@@ -0,0 +1,176 @@
+import numpy as np
+
+from pypokerengine.utils.batch_hand_evaluator import eval_hands
+
+FOLD, CALL, RAISE = 0, 1, 2
+PREFLOP, FLOP, TURN, RIVER, FINISHED = 0, 1, 2, 3, 4
+
+# community cards visible on each street
+BOARD_SIZE = np.array([0, 3, 4, 5, 5])
+
+class BatchEmulator(object):
+    """Heads-up limit hold'em for many independent games stepped in lockstep.
+
+    Every game state lives in NumPy arrays indexed by game, and step() applies one
+    action per game that is still in a hand. Betting follows RoundManager and
+    ActionChecker: raises of 2 small blinds on preflop/flop and 4 on turn/river, no
+    raise once the street bet reaches 4 raise sizes, no raise for a player who raised
+    4 times on the finished streets of the hand, and the small blind acts first on
+    every street. A raise that is not allowed is played as a call.
+
+    Hands are independent: stacks are not carried between hands, so initial_stack
+    has to cover the most a hand can cost (48 small blinds) and nobody is ever all-in.
+    Players are 0 and 1 and swap the small blind every hand.
+    """
+
+    def __init__(self, game_num, small_blind_amount=20, initial_stack=10000, seed=None):
+        if initial_stack < small_blind_amount * 48:
+            raise ValueError("initial_stack must cover 48 small blinds, all-in is not supported")
+        self.game_num = game_num
+        self.small_blind_amount = small_blind_amount
+        self.initial_stack = initial_stack
+        self.rng = np.random.default_rng(seed)
+
+        sb = small_blind_amount
+        self.raise_size = np.array([2 * sb, 2 * sb, 4 * sb, 4 * sb, 0])
+        self.raise_limit = self.raise_size * 4
+
+        n = game_num
+        self.hole_card = np.zeros((n, 2, 2), dtype=np.int64)    # card ids per player
+        self.community_card = np.zeros((n, 5), dtype=np.int64)  # all five, see visible_community_card
+        self.street = np.full(n, FINISHED)
+        self.sb_player = np.ones(n, dtype=np.int64)
+        self.next_player = np.zeros(n, dtype=np.int64)
+        self.paid = np.zeros((n, 2), dtype=np.int64)            # chips put in this hand
+        self.street_bet = np.zeros((n, 2), dtype=np.int64)      # paid on the current street
+        self.acted = np.zeros((n, 2), dtype=bool)
+        self.street_raises = np.zeros((n, 2), dtype=np.int64)
+        self.finished_raises = np.zeros((n, 2), dtype=np.int64) # raises on finished streets of the hand
+
+        self.payoff = np.zeros((n, 2), dtype=np.int64)          # result of the last finished hand
+        self.winnings = np.zeros((n, 2), dtype=np.int64)
+        self.hand_count = np.zeros(n, dtype=np.int64)
+
+    def start_new_hands(self, games=None):
+        """Deal and post the blinds in games, by default every game that is not in a hand."""
+        games = np.flatnonzero(self.street == FINISHED) if games is None else np.asarray(games)
+        if len(games) == 0: return games
+        sb = self.small_blind_amount
+
+        cards = self.rng.random((len(games), 52)).argsort(axis=1)[:, :9] + 1
+        self.hole_card[games] = cards[:, :4].reshape(-1, 2, 2)
+        self.community_card[games] = cards[:, 4:]
+
+        self.sb_player[games] = 1 - self.sb_player[games]
+        sb_player = self.sb_player[games]
+        self.street[games] = PREFLOP
+        self.next_player[games] = sb_player
+        self.street_bet[games, sb_player] = sb
+        self.street_bet[games, 1 - sb_player] = 2 * sb
+        self.paid[games] = self.street_bet[games]
+        self.acted[games] = False
+        self.street_raises[games] = 0
+        self.finished_raises[games] = 0
+        return games
+
+    def playing_games(self):
+        return np.flatnonzero(self.street != FINISHED)
+
+    def can_raise(self, games):
+        player = self.next_player[games]
+        street = self.street[games]
+        agree_amount = self.street_bet[games].max(axis=1)
+        return (agree_amount < self.raise_limit[street]) & (self.finished_raises[games, player] < 4)
+
+    def call_amount(self, games):
+        return self.street_bet[games].max(axis=1)
+
+    def visible_community_card(self, game):
+        return self.community_card[game, :BOARD_SIZE[self.street[game]]]
+
+    def step(self, games, actions):
+        """Apply actions (FOLD, CALL or RAISE) to games, returns the games whose hand ended."""
+        games = np.asarray(games)
+        actions = np.asarray(actions)
+        player = self.next_player[games]
+        opponent = 1 - player
+        street = self.street[games]
+
+        actions = np.where((actions == RAISE) & ~self.can_raise(games), CALL, actions)
+        fold = actions == FOLD
+        raise_ = actions == RAISE
+
+        agree_amount = self.street_bet[games].max(axis=1)
+        bet = np.where(raise_, agree_amount + self.raise_size[street], agree_amount)
+        pay = np.where(fold, 0, bet - self.street_bet[games, player])
+        self.street_bet[games, player] += pay
+        self.paid[games, player] += pay
+        self.street_raises[games, player] += raise_
+        self.acted[games, player] = True
+
+        closed = ~fold & self.acted[games, opponent] & (self.street_bet[games, 0] == self.street_bet[games, 1])
+        self.next_player[games] = opponent
+
+        folded_games = games[fold]
+        self.__finish_hands(folded_games, self.__fold_payoff(folded_games, player[fold]))
+
+        closed_games = games[closed]
+        self.finished_raises[closed_games] += self.street_raises[closed_games]
+        self.street_raises[closed_games] = 0
+        self.street_bet[closed_games] = 0
+        self.acted[closed_games] = False
+        self.street[closed_games] += 1
+        self.next_player[closed_games] = self.sb_player[closed_games]
+
+        showdown_games = closed_games[self.street[closed_games] == FINISHED]
+        self.__finish_hands(showdown_games, self.__showdown_payoff(showdown_games))
+        return np.concatenate([folded_games, showdown_games])
+
+    def __fold_payoff(self, games, folder):
+        payoff = np.zeros((len(games), 2), dtype=np.int64)
+        lost = self.paid[games, folder]
+        payoff[np.arange(len(games)), folder] = -lost
+        payoff[np.arange(len(games)), 1 - folder] = lost
+        return payoff
+
+    def __showdown_payoff(self, games):
+        scores = [eval_hands(self.hole_card[games, p], self.community_card[games]) for p in (0, 1)]
+        # bets are equal at showdown, so the winner takes the other's payment and a tie splits evenly
+        result = np.sign(scores[0] - scores[1])
+        lost = self.paid[games, 0]
+        return np.stack([result * lost, -result * lost], axis=1)
+
+    def __finish_hands(self, games, payoff):
+        self.street[games] = FINISHED
+        self.payoff[games] = payoff
+        self.winnings[games] += payoff
+        self.hand_count[games] += 1
+
+
+def play_hands(emulator, players, hand_num):
+    """Play hand_num hands per game with batch players and return the total winnings of each player.
+
+    players[i].declare_actions(emulator, games) returns FOLD/CALL/RAISE for every game
+    in games, which are the games where player i is to act.
+    """
+    emulator.start_new_hands()
+    while True:
+        games = emulator.playing_games()
+        if len(games) == 0: break
+        for idx, player in enumerate(players):
+            acting = games[(emulator.next_player[games] == idx) & (emulator.street[games] != FINISHED)]
+            if len(acting) != 0:
+                emulator.step(acting, player.declare_actions(emulator, acting))
+        unfinished = np.flatnonzero((emulator.street == FINISHED) & (emulator.hand_count < hand_num))
+        emulator.start_new_hands(unfinished)
+    return emulator.winnings.sum(axis=0)
+
+
+class RandomBatchPlayer(object):
+    """Uniform random over fold, call and raise, like RandomPlayer."""
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def declare_actions(self, emulator, games):
+        return self.rng.integers(0, 3, len(games))
@@ -0,0 +1,95 @@
+""" Run a BasePokerPlayer class out of process for RemotePlayer.
+
+$ python -m pypokerengine.api.bot_host module:ClassName --stdio          frames on stdin/stdout
+$ python -m pypokerengine.api.bot_host module:ClassName --connect PATH   connect to a Unix socket
+$ python -m pypokerengine.api.bot_host module:ClassName --listen PATH    serve connections one by one,
+                                                                         a new bot for each of them
+"""
+import os
+import sys
+import random
+import socket
+import asyncio
+import inspect
+import importlib
+import traceback
+from argparse import ArgumentParser
+
+from pypokerengine.api.bot_protocol import FrameStream
+
+def load_bot_class(spec):
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+def serve(algorithm, stream):
+    """Answer the frames of one connection until it closes"""
+    loop = None
+    while True:
+        frame = stream.read_frame()
+        if frame is None or frame["type"] == "close": return
+        frame_type = frame["type"]
+        if frame_type == "hello":
+            subscriptions = algorithm.subscribed_notifications()
+            stream.write_frame({ "subscriptions": sorted(subscriptions) if subscriptions is not None else None })
+        elif frame_type == "set_uuid":
+            algorithm.set_uuid(frame["uuid"])
+        elif frame_type == "set_rng":
+            algorithm.set_rng(random.Random(frame["seed"]))
+        elif frame_type == "notification":
+            _call_bot(algorithm.receive_notification, frame["message"])
+        elif frame_type == "ask":
+            action = _call_bot(algorithm.declare_action, frame["valid_actions"], frame["hole_card"], frame["round_state"])
+            if inspect.isawaitable(action):
+                loop = loop or asyncio.new_event_loop()
+                action = _call_bot(loop.run_until_complete, action)
+            stream.write_frame({ "seq": frame["seq"], "action": action if action is not None else "fold" })
+        else:
+            raise ValueError("Received unexpected frame which type is [%s]" % frame_type)
+
+# an exception of the bot is printed and the bot folds, the host keeps serving
+def _call_bot(method, *args):
+    try:
+        return method(*args)
+    except Exception:
+        traceback.print_exc()
+        return "fold"
+
+def _stdio_stream():
+    # frames keep the real stdout, whatever the bot prints goes to stderr
+    protocol_out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    return FrameStream(sys.stdin.buffer, protocol_out)
+
+def _socket_stream(connection):
+    return FrameStream(connection.makefile("rb"), connection.makefile("wb"))
+
+def parse_arguments():
+    parser = ArgumentParser()
+    parser.add_argument('bot', help="Bot class as module:ClassName")
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument('--stdio', help="Talk over stdin/stdout", action='store_true')
+    transport.add_argument('--connect', help="Connect to the Unix socket at PATH", metavar='PATH')
+    transport.add_argument('--listen', help="Listen on the Unix socket at PATH", metavar='PATH')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    bot_class = load_bot_class(args.bot)
+    if args.stdio:
+        serve(bot_class(), _stdio_stream())
+    elif args.connect:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(args.connect)
+        serve(bot_class(), _socket_stream(connection))
+    else:
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(args.listen)
+        server.listen(1)
+        try:
+            while True:
+                connection, _ = server.accept()
+                with connection:
+                    serve(bot_class(), _socket_stream(connection))
+        finally:
+            os.remove(args.listen)
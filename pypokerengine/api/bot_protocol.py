@@ -0,0 +1,60 @@
+import json
+import struct
+
+# A frame is a 4 byte big endian payload size followed by compact JSON.
+#
+# Engine -> bot frames and the bot's replies:
+#   {"type": "hello"}                              -> {"subscriptions": [message types] or null}
+#   {"type": "set_uuid", "uuid": uuid}
+#   {"type": "set_rng", "seed": seed}
+#   {"type": "notification", "message": message}     message as built by MessageBuilder
+#   {"type": "ask", "seq": n, "valid_actions": ..., "hole_card": ..., "round_state": ...}
+#                                                  -> {"seq": n, "action": action}
+#   {"type": "close"}
+# seq tells a late reply to a timed out ask from the reply to the current one.
+
+_SIZE = struct.Struct(">I")
+
+class FrameStream(object):
+    """Read and write frames on a pair of binary file objects (pipes or a socket makefile).
+
+    Received bytes are buffered until a whole frame is in, so a read that is
+    interrupted (eg by the SIGALRM of timeout2) loses nothing and the next
+    read_frame carries on where it stopped.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.__buffer = bytearray()
+
+    def write_frame(self, obj):
+        payload = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+        self.writer.write(_SIZE.pack(len(payload)) + payload)
+        self.writer.flush()
+
+    def read_frame(self):
+        """Next frame, None at the end of the stream"""
+        while True:
+            frame = self.__pop_frame()
+            if frame is not None: return frame
+            chunk = self.reader.read1(1 << 16)
+            if not chunk:
+                if self.__buffer: raise EOFError("Stream closed in the middle of a frame")
+                return None
+            self.__buffer += chunk
+
+    def close(self):
+        for f in (self.writer, self.reader):
+            try:
+                f.close()
+            except OSError:
+                pass
+
+    def __pop_frame(self):
+        if len(self.__buffer) < _SIZE.size: return None
+        end = _SIZE.size + _SIZE.unpack_from(self.__buffer)[0]
+        if len(self.__buffer) < end: return None
+        payload = bytes(self.__buffer[_SIZE.size:end])
+        del self.__buffer[:end]
+        return json.loads(payload.decode("utf-8"))
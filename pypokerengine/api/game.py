@@ -1,20 +1,118 @@
+import random
+import asyncio
+import inspect
+from time import perf_counter
+
 from pypokerengine.engine.dealer import Dealer
+from pypokerengine.engine.async_dealer import AsyncDealer
+from pypokerengine.engine.deck import Deck
 from pypokerengine.players import BasePokerPlayer
-from pypokerengine.utils.timeout_decorator import timeout2
+from pypokerengine.utils.timeout_decorator import timeout2, async_timeout
+from pypokerengine.utils.latency_histogram import LatencyHistogram, record_latency
+from pypokerengine.utils.rng_utils import derive_rng
+from pypokerengine.utils.profiler import PhaseProfiler
+
+def setup_config(max_round, initial_stack, small_blind_amount, ante=0, seed=None):
+    return Config(max_round, initial_stack, small_blind_amount, ante, seed)
+
+def start_poker(config, verbose=2, profile=False):
+    """Play one game. With profile, the result has a "profile" summary of where the time went."""
+    config.validation()
+    profiler = PhaseProfiler() if profile else None
+    result_message = _play_game(config, config.players_info, config.next_game_rng(), verbose, profiler)
+    result = _format_result(result_message)
+    result["latency"] = config.latency_summary()
+    if profiler: result["profile"] = profiler.summary()
+    return result
+
+async def start_poker_async(config, verbose=2, profile=False):
+    """start_poker as a coroutine, players may define `async def declare_action`.
 
-def setup_config(max_round, initial_stack, small_blind_amount, ante=0):
-    return Config(max_round, initial_stack, small_blind_amount, ante)
+    Games of many configs can run concurrently in one event loop, see play_tables.
+    """
+    config.validation()
+    profiler = PhaseProfiler() if profile else None
+    dealer = _setup_dealer(config, config.players_info, config.next_game_rng(), verbose, profiler, AsyncDealer)
+    start = perf_counter()
+    result_message = await dealer.start_game(config.max_round)
+    result = _format_result(result_message)
+    result["latency"] = config.latency_summary()
+    if profiler:
+        profiler.add("game", perf_counter() - start)
+        result["profile"] = profiler.summary()
+    return result
+
+def play_tables(configs, verbose=0):
+    """Play one game per config concurrently in a new event loop, returns the results in config order"""
+    async def play_all():
+        return await asyncio.gather(*[start_poker_async(config, verbose) for config in configs])
+    return asyncio.run(play_all())
+
+def start_duplicate_poker(config, verbose=2):
+    """Play one game once per seat rotation with the same deck sequence.
 
-def start_poker(config, verbose=2):
+    Every replay starts from the same game RNG, so round k is dealt the same
+    deck each time while the players move one seat. For heads-up this is the
+    game plus its seat-swapped copy, and luck of the cards cancels out of
+    "paired_difference" (net chips of player 1 minus player 2).
+    """
     config.validation()
-    dealer = Dealer(config.sb_amount, config.initial_stack, config.ante)
+    game_seed = config.seed if config.seed is not None else random.getrandbits(64)
+    game_number = config.next_game_number()
+
+    player_num = len(config.players_info)
+    games = []
+    for shift in range(player_num):
+        # player j sits in seat (j + shift) % player_num
+        seated = config.players_info[-shift:] + config.players_info[:-shift] if shift else config.players_info
+        result_message = _play_game(config, seated, derive_rng(game_seed, game_number), verbose)
+        games.append(_format_result(result_message))
+
+    players = []
+    for idx, info in enumerate(config.players_info):
+        seats = [game["players"][(idx + shift) % player_num] for shift, game in enumerate(games)]
+        stack = sum([seat["stack"] for seat in seats])
+        players.append({ "name": info["name"], "stack": stack, "net": stack - config.initial_stack * player_num })
+
+    result = { "rule": games[0]["rule"], "players": players, "games": games, "latency": config.latency_summary() }
+    if player_num == 2:
+        result["paired_difference"] = players[0]["net"] - players[1]["net"]
+    return result
+
+def play_dealt_round(dealer, players, deck_ids, round_count, stack):
+    """Play one round on dealer's table dealt from deck_ids, everyone starting with stack chips.
+
+    players are the dealer's registered Player objects in seat order, seat 0 has the button.
+    Returns {uuid: chips won}. Benchmarks play every deal twice with the seats swapped
+    (duplicate pairs) so the luck of the cards cancels out.
+    """
+    table = dealer.table
+    table.seats.players = players
+    for player in players:
+        player.stack = stack
+    table.deck = Deck(cheat=True, cheat_card_ids=deck_ids)
+    table.dealer_btn = 0
+    table.set_blind_pos(1, 0)
+
+    # play_round works on a copy of the table and hands the copy back
+    result = dealer.play_round(round_count, dealer.small_blind_amount, dealer.ante, table)
+    return { player.uuid: player.stack - stack for player in result.seats.players }
+
+def _play_game(config, players_info, rng, verbose, profiler=None):
+    dealer = _setup_dealer(config, players_info, rng, verbose, profiler)
+    if profiler: return profiler.measure("game", dealer.start_game, config.max_round)
+    return dealer.start_game(config.max_round)
+
+def _setup_dealer(config, players_info, rng, verbose, profiler, dealer_class=Dealer):
+    dealer = dealer_class(config.sb_amount, config.initial_stack, config.ante, rng=rng)
     dealer.set_verbose(verbose)
+    dealer.set_profiler(profiler)
+    dealer.set_hand_history(config.hand_history)
     dealer.set_blind_structure(config.blind_structure)
-    for info in config.players_info:
+    for info in players_info:
         dealer.register_player(info["name"], info["algorithm"])
         # print(info["algorithm"].declare_action)
-    result_message = dealer.start_game(config.max_round)
-    return _format_result(result_message)
+    return dealer
 
 def _format_result(result_message):
     return {
@@ -24,28 +122,53 @@ def _format_result(result_message):
 
 class Config(object):
 
-    def __init__(self, max_round, initial_stack, sb_amount, ante):
+    def __init__(self, max_round, initial_stack, sb_amount, ante, seed=None):
         self.players_info = []
         self.blind_structure = {}
         self.max_round = max_round
         self.initial_stack = initial_stack
         self.sb_amount = sb_amount
         self.ante = ante
+        self.seed = seed
+        self.game_count = 0
+        self.hand_history = None
 
     def register_player(self, name, algorithm):
         if not isinstance(algorithm, BasePokerPlayer):
             base_msg = 'Poker player must be child class of "BasePokerPlayer". But its parent was "%s"'
             raise TypeError(base_msg % algorithm.__class__.__bases__)
 
-        # Wrap the function with a timeout
+        # Wrap the function with a timeout, and time it including the timed out calls
         default_action_info      = "fold"
-        algorithm.declare_action = timeout2(0.5,default_action_info)(algorithm.declare_action)
-        info = { "name" : name, "algorithm" : algorithm }
+        latency = LatencyHistogram()
+        # asyncio.wait_for for async players, they can only play with start_poker_async
+        timeout = async_timeout if inspect.iscoroutinefunction(algorithm.declare_action) else timeout2
+        declare_action = timeout(0.5,default_action_info,on_timeout=latency.add_timeout)(algorithm.declare_action)
+        algorithm.declare_action = record_latency(latency)(declare_action)
+        info = { "name" : name, "algorithm" : algorithm, "latency" : latency }
         self.players_info.append(info)
 
+    def latency_summary(self):
+        """declare_action latency percentiles and timeout count of every game played with this config,
+        one dict per player in registration order, with its "name" (names may repeat)"""
+        return [dict(info["latency"].summary(), name=info["name"]) for info in self.players_info]
+
     def set_blind_structure(self, blind_structure):
         self.blind_structure = blind_structure
 
+    def set_hand_history(self, hand_history):
+        """Log every round played with this config to a HandHistoryWriter"""
+        self.hand_history = hand_history
+
+    def next_game_number(self):
+        self.game_count += 1
+        return self.game_count
+
+    def next_game_rng(self):
+        """RNG of the next game, derived from seed and game number. None when no seed is set."""
+        game_number = self.next_game_number()
+        return derive_rng(self.seed, game_number) if self.seed is not None else None
+
     def validation(self):
         player_num = len(self.players_info)
         if player_num < 2:
@@ -0,0 +1,121 @@
+import os
+import sys
+import socket
+import shutil
+import tempfile
+import subprocess
+
+from pypokerengine.players import BasePokerPlayer
+from pypokerengine.api.bot_protocol import FrameStream
+
+class RemotePlayer(BasePokerPlayer):
+    """Proxy of a bot that runs in another process, over the frame protocol of bot_protocol.
+
+    RemotePlayer("module:ClassName") starts a bot host process for the bot class and
+    keeps the connection for the whole session, talking over the host's stdin/stdout
+    (transport="stdio") or a Unix socket (transport="unix"). RemotePlayer(address=path)
+    connects to a host already listening on a Unix socket (bot_host --listen path).
+
+    Each bot gets its own interpreter, so CPU heavy bots run on their own cores. A bot
+    process that crashes or closes the connection only folds from then on.
+    """
+
+    def __init__(self, bot=None, transport="stdio", address=None, python=sys.executable, connect_timeout=10):
+        self.seq = 0
+        self.alive = True
+        self.process = None
+        self.__socket_dir = None
+        if address is not None:
+            self.stream = self.__connect(address, connect_timeout)
+        elif transport == "stdio":
+            self.stream = self.__spawn_stdio(bot, python)
+        elif transport == "unix":
+            self.stream = self.__spawn_unix(bot, python, connect_timeout)
+        else:
+            raise ValueError("Unknown transport [%s], use stdio or unix" % transport)
+        reply = self.__request({ "type": "hello" })
+        subscriptions = reply.get("subscriptions") if reply else None
+        self.subscriptions = set(subscriptions) if subscriptions is not None else None
+
+    def declare_action(self, valid_actions, hole_card, round_state):
+        self.seq += 1
+        reply = self.__request({ "type": "ask", "seq": self.seq,
+            "valid_actions": valid_actions, "hole_card": hole_card, "round_state": round_state })
+        return reply["action"] if reply else "fold"
+
+    def receive_notification(self, message):
+        self.__send({ "type": "notification", "message": message })
+
+    def set_uuid(self, uuid):
+        super().set_uuid(uuid)
+        self.__send({ "type": "set_uuid", "uuid": uuid })
+
+    # the bot gets its own stream seeded from rng, so seeded games stay reproducible
+    def set_rng(self, rng):
+        super().set_rng(rng)
+        self.__send({ "type": "set_rng", "seed": rng.getrandbits(64) })
+
+    def subscribed_notifications(self):
+        return self.subscriptions
+
+    def close(self):
+        self.__send({ "type": "close" })
+        self.alive = False
+        self.stream.close()
+        if self.process: self.process.wait()
+        if self.__socket_dir: shutil.rmtree(self.__socket_dir, ignore_errors=True)
+
+    def __send(self, frame):
+        if not self.alive: return
+        try:
+            self.stream.write_frame(frame)
+        except (OSError, ValueError) as e:
+            self.__fail(e)
+
+    # reply of the bot, None once the bot is gone
+    def __request(self, frame):
+        self.__send(frame)
+        while self.alive:
+            try:
+                reply = self.stream.read_frame()
+            except (OSError, ValueError, EOFError) as e:
+                self.__fail(e)
+                return None
+            if reply is None:
+                self.__fail("connection closed")
+                return None
+            # replies to asks that timed out earlier are dropped
+            if reply.get("seq") == frame.get("seq"):
+                return reply
+        return None
+
+    def __fail(self, reason):
+        self.alive = False
+        sys.stderr.write("[RemotePlayer] bot disconnected (%s), folding from now on\n" % reason)
+
+    def __spawn_stdio(self, bot, python):
+        self.process = subprocess.Popen([python, "-m", "pypokerengine.api.bot_host", bot, "--stdio"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        return FrameStream(self.process.stdout, self.process.stdin)
+
+    def __spawn_unix(self, bot, python, connect_timeout):
+        self.__socket_dir = tempfile.mkdtemp(prefix="pypokerengine-bot-")
+        path = os.path.join(self.__socket_dir, "bot.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(path)
+            server.listen(1)
+            server.settimeout(connect_timeout)
+            self.process = subprocess.Popen([python, "-m", "pypokerengine.api.bot_host", bot, "--connect", path])
+            connection, _ = server.accept()
+        finally:
+            server.close()
+        connection.settimeout(None)
+        return FrameStream(connection.makefile("rb"), connection.makefile("wb"))
+
+    def __connect(self, address, connect_timeout):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(connect_timeout)
+        connection.connect(address)
+        connection.settimeout(None)
+        return FrameStream(connection.makefile("rb"), connection.makefile("wb"))
@@ -1,5 +1,3 @@
-from functools import reduce
-
 class ActionChecker:
 
   @classmethod
@@ -83,13 +81,12 @@ class ActionChecker:
 
   @classmethod
   def __fetch_last_raise(self, players):
-    all_histories = [p.action_histories for p in players]
-    all_histories = reduce(lambda acc, e: acc + e, all_histories)  # flatten
-    raise_histories = [h for h in all_histories if h["action"] in ["RAISE", "SMALLBLIND", "BIGBLIND"]]
-    if len(raise_histories) == 0:
-      return None
-    else:
-      return max(raise_histories, key=lambda h: h["amount"])  # maxby
+    last_raise = None
+    for player in players:
+      raise_ = player.action_histories.last_raise
+      if raise_ and (last_raise is None or raise_["amount"] > last_raise["amount"]):
+        last_raise = raise_
+    return last_raise
 
   @classmethod
   def round_raise_amount(self, sb_amount,street):
@@ -100,13 +97,4 @@ class ActionChecker:
 
   @classmethod
   def __player_raise_number(self,players,player_pos,street):
-    raised_number = 0
-    histories = players[player_pos].round_action_histories
-    for rounds in histories:
-      if rounds == None:
-        return raised_number
-      else:
-        for action in rounds:
-          if action["action"] == "RAISE":
-            raised_number += 1
-    return raised_number
\ No newline at end of file
+    return players[player_pos].finished_streets_raise_number()
\ No newline at end of file
@@ -0,0 +1,49 @@
+class ActionLog(list):
+
+  # Action histories of one player on one street. It is still the list of
+  # history dicts that round_state exposes, but every append also updates
+  # the aggregates that ActionChecker and Player used to rescan the list for.
+  # The log is append-only: replacing or deleting entries is not tracked.
+  def __init__(self, histories=()):
+    super().__init__()
+    self.paid_sum = 0        # amount of the last history that put chips in, except ante
+    self.last_raise = None   # first history with the highest amount among raises and blinds
+    self.raise_count = 0
+    self.extend(histories)
+
+  def append(self, history):
+    super().append(history)
+    action = history["action"]
+    if action not in ["FOLD", "ANTE"]:
+      self.paid_sum = history["amount"]
+    if action in ["RAISE", "SMALLBLIND", "BIGBLIND"]:
+      if self.last_raise is None or history["amount"] > self.last_raise["amount"]:
+        self.last_raise = history
+    if action == "RAISE":
+      self.raise_count += 1
+
+  def extend(self, histories):
+    for history in histories:
+      self.append(history)
+
+  def __iadd__(self, histories):
+    self.extend(histories)
+    return self
+
+  # copy with the aggregates carried over instead of recounted
+  def copy(self):
+    log = self.__class__.__new__(self.__class__)
+    list.extend(log, self)
+    log.paid_sum = self.paid_sum
+    log.last_raise = self.last_raise
+    log.raise_count = self.raise_count
+    return log
+
+  # copy and pickle rebuild the aggregates from the histories
+  def __reduce__(self):
+    return (self.__class__, (list(self),))
+
+  # histories may also be a plain list restored from a round_state
+  @classmethod
+  def of(self, histories):
+    return histories if isinstance(histories, ActionLog) else self(histories)
@@ -0,0 +1,29 @@
+import asyncio
+import inspect
+
+from pypokerengine.engine.dealer import Dealer
+
+class AsyncDealer(Dealer):
+
+  # Plays the same game as Dealer inside an asyncio event loop. When a player's
+  # declare_action is a coroutine it is awaited, so the other tables of the loop
+  # keep playing while the player thinks. Synchronous players are called as usual,
+  # and the dealer yields to the loop after them so no table starves the others.
+  async def start_game(self, max_round):
+    return await self.__run_steps(self.game_steps(max_round))
+
+  async def play_round(self, round_count, blind_amount, ante, table):
+    return await self.__run_steps(self.round_steps(round_count, blind_amount, ante, table))
+
+  async def __run_steps(self, steps):
+    try:
+      ask = next(steps)
+      while True:
+        action = self.message_handler.process_message(*ask)
+        if inspect.isawaitable(action):
+          action = await action
+        else:
+          await asyncio.sleep(0)
+        ask = steps.send(action)
+    except StopIteration as stop:
+      return stop.value
@@ -1,3 +1,4 @@
+
 class Card:
 
   CLUB = 2
@@ -28,23 +29,65 @@ class Card:
       14 : 'A'
   }
 
+  # There are exactly 52 Card objects. Card(suit, rank), from_id and from_str
+  # all return the shared instance, so cards must be treated as immutable.
+  __slots__ = ("suit", "rank", "_id", "_str")
+
+  __by_suit_rank = {}
+  __by_id = [None] * 53
+  __by_str = {}
 
-  def __init__(self, suit, rank):
-    self.suit = suit
-    self.rank = 14 if rank == 1 else rank
+  def __new__(cls, suit, rank):
+    rank = 14 if rank == 1 else rank
+    card = cls.__by_suit_rank.get((suit, rank))
+    return card if card else cls.__create(suit, rank)
 
   def __eq__(self, other):
     return self.suit == other.suit and self.rank == other.rank
 
+  def __hash__(self):
+    return self._id
+
   def __str__(self):
-    suit = self.SUIT_MAP[self.suit]
-    rank = self.RANK_MAP[self.rank]
-    return "{0}{1}".format(suit, rank)
+    return self._str
+
+  # interned cards survive copy and pickle as the same instance
+  def __copy__(self):
+    return self
+
+  def __deepcopy__(self, memo):
+    return self
+
+  def __reduce__(self):
+    return (Card.from_id, (self._id,))
 
   def to_id(self):
-    rank = 1 if self.rank == 14 else self.rank
+    return self._id
+
+  @classmethod
+  def from_id(cls, card_id):
+    return cls.__by_id[card_id]
+
+  @classmethod
+  def from_str(cls, str_card):
+    assert(len(str_card)==2)
+    card = cls.__by_str.get(str_card)
+    return card if card else cls.__by_str[str_card[0].upper() + str_card[1]]
+
+  @classmethod
+  def __create(cls, suit, rank):
+    card = object.__new__(cls)
+    card.suit = suit
+    card.rank = rank
+    card._id = cls.__calc_id(suit, rank)
+    card._str = "{0}{1}".format(cls.SUIT_MAP[suit], cls.RANK_MAP[rank])
+    return card
+
+  @classmethod
+  def __calc_id(cls, suit, rank):
+    rank = 1 if rank == 14 else rank
     num = 0
-    tmp = self.suit >> 1
+    tmp = suit >> 1
     while tmp&1 != 1:
       num += 1
       tmp >>= 1
@@ -52,19 +95,13 @@ class Card:
     return rank + 13 * num
 
   @classmethod
-  def from_id(cls, card_id):
-    suit, rank = 2, card_id
-    while rank > 13:
-      suit <<= 1
-      rank -= 13
-
-    return cls(suit, rank)
+  def _setup_interned_cards(cls):
+    for suit in cls.SUIT_MAP:
+      for rank in cls.RANK_MAP:
+        card = cls.__create(suit, rank)
+        cls.__by_suit_rank[(suit, rank)] = card
+        cls.__by_id[card._id] = card
+        cls.__by_str[card._str] = card
 
-  @classmethod
-  def from_str(cls, str_card):
-    assert(len(str_card)==2)
-    inverse = lambda hsh: {v:k for k,v in hsh.items()}
-    suit = inverse(cls.SUIT_MAP)[str_card[0].upper()]
-    rank = inverse(cls.RANK_MAP)[str_card[1]]
-    return cls(suit, rank)
+Card._setup_interned_cards()
 
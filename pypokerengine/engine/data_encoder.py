@@ -2,7 +2,7 @@ from functools import reduce
 
 from pypokerengine.engine.pay_info import PayInfo
 from pypokerengine.engine.poker_constants import PokerConstants as Const
-from pypokerengine.engine.game_evaluator import GameEvaluator
+from pypokerengine.engine.pot import Pot
 
 class DataEncoder:
 
@@ -30,11 +30,14 @@ class DataEncoder:
         }
 
   @classmethod
-  def encode_pot(self, players):
-    pots = GameEvaluator.create_pot(players)
-    main = { "amount": pots[0]["amount"] }
+  def encode_pot(self, players, pot=None):
+    pot = pot if pot is not None else Pot.from_players(players)
+    if not pot.has_side_pot():
+      return { "main": { "amount": pot.amount }, "side": [] }
+    pots = pot.gen_pots(players)
+    main = { "amount": pots[0][0] }
     gen_hsh = lambda sidepot: \
-            { "amount": sidepot["amount"], "eligibles": [p.uuid for p in sidepot["eligibles"]] }
+            { "amount": sidepot[0], "eligibles": [players[idx].uuid for idx in sidepot[1]] }
     side = [ gen_hsh(sidepot) for sidepot in pots[1:] ]
     return { "main": main, "side": side }
 
@@ -96,7 +99,7 @@ class DataEncoder:
   def encode_round_state(self, state):
     hsh = {
         "street": self.__street_to_str(state["street"]),
-        "pot": self.encode_pot(state["table"].seats.players),
+        "pot": self.encode_pot(state["table"].seats.players, state["table"].pot),
         "community_card": [str(card) for card in state["table"].get_community_card()],
         "dealer_btn": state["table"].dealer_btn,
         "next_player": state["next_player"],
@@ -6,51 +6,92 @@ from pypokerengine.engine.table import Table
 from pypokerengine.engine.player import Player
 from pypokerengine.engine.round_manager import RoundManager
 from pypokerengine.engine.message_builder import MessageBuilder
+from pypokerengine.utils.rng_utils import spawn_rng
+from pypokerengine.utils.profiler import profiled
 
 class Dealer:
 
-  def __init__(self, small_blind_amount=None, initial_stack=None, ante=None):
+  def __init__(self, small_blind_amount=None, initial_stack=None, ante=None, rng=None):
     self.small_blind_amount = small_blind_amount
     self.ante = ante if ante else 0
     self.initial_stack = initial_stack
+    # seeded game: uuids, deck and players each get their own stream from rng
+    self.rng = rng
     self.uuid_list = self.__generate_uuid_list()
     self.message_handler = MessageHandler()
     self.message_summarizer = MessageSummarizer(verbose=0)
-    self.table = Table()
+    self.table = Table(rng=spawn_rng(rng) if rng else None)
     self.blind_structure = {}
+    self.profiler = None
+    self.hand_history = None
+    # notification types to build, None builds all of them
+    self.notifications = None
 
   def register_player(self, player_name, algorithm):
     self.__config_check()
     uuid = self.__escort_player_to_table(player_name)
     algorithm.set_uuid(uuid)
-    self.__register_algorithm_to_message_handler(uuid, algorithm)
+    if self.rng: algorithm.set_rng(spawn_rng(self.rng))
+    self.__register_algorithm_to_message_handler(uuid, algorithm, player_name)
+    self.notifications = self.__notifications_to_build()
 
   def set_verbose(self, verbose):
       self.message_summarizer.verbose = verbose
+      self.notifications = self.__notifications_to_build()
+
+  # profiler is a PhaseProfiler, None turns profiling off
+  def set_profiler(self, profiler):
+    self.profiler = profiler
+    self.message_handler.profiler = profiler
+
+  # hand_history is a HandHistoryWriter that logs every round, None turns logging off
+  def set_hand_history(self, hand_history):
+    self.hand_history = hand_history
 
   def start_game(self, max_round):
+    return self.__run_steps(self.game_steps(max_round))
+
+  def play_round(self, round_count, blind_amount, ante, table):
+    return self.__run_steps(self.round_steps(round_count, blind_amount, ante, table))
+
+  # The game as a generator: it yields every ask as (uuid, ask message) and is sent
+  # back the declared action, so the caller decides how to wait for the players.
+  # It returns the game result message.
+  def game_steps(self, max_round):
     table = self.table
+    if self.hand_history: self.hand_history.begin_game(table.seats)
     self.__notify_game_start(max_round)
     ante, sb_amount = self.ante, self.small_blind_amount
     for round_count in range(1, max_round+1):
       ante, sb_amount = self.__update_forced_bet_amount(ante, sb_amount, round_count, self.blind_structure)
       table = self.__exclude_short_of_money_players(table, ante, sb_amount)
       if self.__is_game_finished(table): break
-      table = self.play_round(round_count, sb_amount, ante, table)
+      table = yield from self.round_steps(round_count, sb_amount, ante, table)
       table.shift_dealer_btn()
     return self.__generate_game_result(max_round, table.seats)
-  
-  def play_round(self, round_count, blind_amount, ante, table):
-    state, msgs = RoundManager.start_new_round(round_count, blind_amount, ante, table)
+
+  # one round of game_steps, returns the table after the round
+  def round_steps(self, round_count, blind_amount, ante, table):
+    notifications, profiler, history = self.notifications, self.profiler, self.hand_history
+    if history: history.begin_round(round_count, blind_amount, ante, table)
+    state, msgs = profiled(profiler, "deal",
+        RoundManager.start_new_round, round_count, blind_amount, ante, table, notifications, profiler)
+    if history: history.record_deal(state["table"])
     while True:
       #TODO:update the play_round
       self.__message_check(msgs, state["street"])
       if state["street"] != Const.Street.FINISHED:  # continue the round
-        action = self.__publish_messages(msgs)
-        state, msgs = RoundManager.apply_action(state, action)
+        self.__publish_notifications(msgs)
+        action = yield msgs[-1]
+        next_state, msgs = profiled(profiler, "apply_action", RoundManager.apply_action, state, action)
+        # logged once the engine took the action
+        if history: history.record_action(state, action)
+        state = next_state
       else:  # finish the round after publish round result
-        self.__publish_messages(msgs)
+        self.__publish_notifications(msgs)
+        if msgs: self.message_handler.process_message(*msgs[-1])
         break
+    if history: history.end_round(state["table"])
     return state["table"]
 
 
@@ -72,8 +113,8 @@ class Dealer:
       ante, sb_amount = update_info["ante"], update_info["small_blind"]
     return ante, sb_amount
 
-  def __register_algorithm_to_message_handler(self, uuid, algorithm):
-    self.message_handler.register_algorithm(uuid, algorithm)
+  def __register_algorithm_to_message_handler(self, uuid, algorithm, player_name):
+    self.message_handler.register_algorithm(uuid, algorithm, player_name)
 
   def __escort_player_to_table(self, player_name):
     uuid = self.__fetch_uuid()
@@ -81,7 +122,14 @@ class Dealer:
     self.table.seats.sitdown(player)
     return uuid
 
+  # Quiet mode: without printing, only the notification types some player subscribes to are built.
+  # None means every type.
+  def __notifications_to_build(self):
+    if self.message_summarizer.verbose != 0: return None
+    return self.message_handler.subscribed_notifications()
+
   def __notify_game_start(self, max_round):
+    if self.notifications is not None and MessageBuilder.GAME_START_MESSAGE not in self.notifications: return
     config = self.__gen_config(max_round)
     start_msg = MessageBuilder.build_game_start_message(config, self.table.seats)
     self.message_handler.process_message(-1, start_msg)
@@ -91,17 +139,24 @@ class Dealer:
     return len([player for player in  table.seats.players if player.is_active()]) == 1
 
   def __message_check(self, msgs, street):
+    if street == Const.Street.FINISHED: return  # the round may end without any message in quiet mode
     address, msg = msgs[-1]
-    invalid = msg["type"] != 'ask'
-    invalid &= street != Const.Street.FINISHED or msg["message"]["message_type"] == 'round_result'
-    if invalid:
+    if msg["type"] != 'ask':
       raise Exception("Last message is not ask type. : %s" % msgs)
 
-  def __publish_messages(self, msgs):
+  # every message but the last one, which is the ask or the round result
+  def __publish_notifications(self, msgs):
     for address, msg in msgs[:-1]:
       self.message_handler.process_message(address, msg)
     self.message_summarizer.summarize_messages(msgs)
-    return self.message_handler.process_message(*msgs[-1])
+
+  def __run_steps(self, steps):
+    try:
+      ask = next(steps)
+      while True:
+        ask = steps.send(self.message_handler.process_message(*ask))
+    except StopIteration as stop:
+      return stop.value
 
   def __exclude_short_of_money_players(self, table, ante, sb_amount):
     sb_pos, bb_pos = self.__steal_money_from_poor_player(table, ante, sb_amount)
@@ -175,26 +230,49 @@ class Dealer:
   def __generate_uuid(self):
     uuid_size = 22
     chars = [chr(code) for code in range(97,123)]
-    return "".join([random.choice(chars) for _ in range(uuid_size)])
+    rng = self.rng if self.rng else random
+    return "".join([rng.choice(chars) for _ in range(uuid_size)])
 
 class MessageHandler:
 
   def __init__(self):
     self.algo_owner_map = {}
+    self.subscriptions = {}
+    self.ask_phases = {}
+    self.profiler = None
 
-  def register_algorithm(self, uuid, algorithm):
+  def register_algorithm(self, uuid, algorithm, player_name=None):
     self.algo_owner_map[uuid] = algorithm
+    self.subscriptions[uuid] = self.__fetch_subscription(algorithm)
+    self.ask_phases[uuid] = "declare_action:%s" % (player_name if player_name is not None else uuid)
+
+  def subscribed_notifications(self):
+    subscribed = set()
+    for subscription in self.subscriptions.values():
+      if subscription is None: return None
+      subscribed |= subscription
+    return subscribed
 
   def process_message(self, address, msg):
     receivers = self.__fetch_receivers(address)
     for receiver in receivers:
       if msg["type"] == 'ask':
-        return receiver.respond_to_ask(msg["message"])
+        return profiled(self.profiler, self.ask_phases[address], receiver.respond_to_ask, msg["message"])
       elif msg["type"] == 'notification':
-        receiver.receive_notification(msg["message"])
+        if self.__is_subscribed(receiver.uuid, msg["message"]["message_type"]):
+          profiled(self.profiler, "receive_notification", receiver.receive_notification, msg["message"])
       else:
         raise ValueError("Received unexpected message which type is [%s]" % msg["type"])
 
+  # None subscribes to every notification, for algorithms that do not tell
+  def __fetch_subscription(self, algorithm):
+    subscribed_notifications = getattr(algorithm, "subscribed_notifications", None)
+    return subscribed_notifications() if subscribed_notifications else None
+
+  def __is_subscribed(self, uuid, message_type):
+    subscription = self.subscriptions.get(uuid)
+    return subscription is None or message_type in subscription
+
 
   def __fetch_receivers(self, address):
     if address == -1:
@@ -1,47 +1,66 @@
-from functools import reduce
-
 from pypokerengine.engine.card import Card
 import random
 
 class Deck:
 
-  def __init__(self, deck_ids=None, cheat=False, cheat_card_ids=[]):
+  # Cards are kept as a permutation of card ids in a fixed 52 byte buffer.
+  # The undrawn cards are the first `size` entries and cards are drawn from the end.
+  FULL_DECK_IDS = bytes(range(1, 53))
+
+  def __init__(self, deck_ids=None, cheat=False, cheat_card_ids=[], rng=None):
     self.cheat = cheat
     self.cheat_card_ids = cheat_card_ids
-    self.deck = [Card.from_id(cid) for cid in deck_ids] if deck_ids else self.__setup()
+    self.rng = rng if rng else random
+    self.__initial_ids = self.__setup()
+    self.__ids = bytearray(52)
+    self.__size = 0
+    self.__load(deck_ids if deck_ids is not None else self.__initial_ids)
+
+  @property
+  def deck(self):
+    return [Card.from_id(cid) for cid in self.__ids[:self.__size]]
+
+  @deck.setter
+  def deck(self, cards):
+    self.__load([card.to_id() for card in cards])
 
   def draw_card(self):
-    return self.deck.pop()
+    if self.__size == 0:
+      raise IndexError("draw from empty deck")
+    self.__size -= 1
+    return Card.from_id(self.__ids[self.__size])
 
   def draw_cards(self, num):
-    return reduce(lambda acc, _: acc + [self.draw_card()], range(num), [])
+    return [self.draw_card() for _ in range(num)]
 
   def size(self):
-    return len(self.deck)
+    return self.__size
 
   def restore(self):
-    self.deck = self.__setup()
+    self.__load(self.__initial_ids)
 
+  # in-place Fisher-Yates over the undrawn cards
   def shuffle(self):
     if not self.cheat:
-      random.shuffle(self.deck)
+      self.rng.shuffle(memoryview(self.__ids)[:self.__size])
 
-  # serialize format : [cheat_flg, chat_card_ids, deck_card_ids]
+  # serialize format : [cheat_flg, chat_card_ids, deck_card_ids(bytes)]
   def serialize(self):
-    return [self.cheat, self.cheat_card_ids, [card.to_id() for card in self.deck]]
+    return [self.cheat, self.cheat_card_ids, bytes(self.__ids[:self.__size])]
 
+  # the rng is not part of the serial, pass the stream the new deck should shuffle with
   @classmethod
-  def deserialize(self, serial):
+  def deserialize(self, serial, rng=None):
     cheat, cheat_card_ids, deck_ids = serial
-    return self(deck_ids=deck_ids, cheat=cheat, cheat_card_ids=cheat_card_ids)
+    return self(deck_ids=deck_ids, cheat=cheat, cheat_card_ids=cheat_card_ids, rng=rng)
 
-  def __setup(self):
-    return self.__setup_cheat_deck() if self.cheat else self.__setup_52_cards()
+  def __load(self, deck_ids):
+    self.__size = len(deck_ids)
+    self.__ids[:self.__size] = bytes(deck_ids)
 
-  def __setup_52_cards(self):
-    return [Card.from_id(cid) for cid in range(1,53)]
+  def __setup(self):
+    return self.__setup_cheat_deck() if self.cheat else self.FULL_DECK_IDS
 
   def __setup_cheat_deck(self):
-    cards = [Card.from_id(cid) for cid in self.cheat_card_ids]
-    return cards[::-1]
+    return bytes(self.cheat_card_ids[::-1])
 
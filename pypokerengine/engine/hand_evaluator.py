@@ -27,7 +27,11 @@ class HandEvaluator:
 
   @classmethod
   def gen_hand_rank_info(self, hole, community):
-    hand = self.eval_hand(hole, community)
+    return self.gen_hand_rank_info_from_score(self.eval_hand(hole, community))
+
+  # same as gen_hand_rank_info for a hand that is already evaluated by eval_hand
+  @classmethod
+  def gen_hand_rank_info_from_score(self, hand):
     row_strength = self.__mask_hand_strength(hand)
     strength = self.HAND_STRENGTH_MAP[row_strength]
     hand_high = self.__mask_hand_high_rank(hand)
@@ -1,5 +1,6 @@
 from pypokerengine.engine.pay_info import PayInfo
 from pypokerengine.engine.card import Card
+from pypokerengine.engine.action_log import ActionLog
 from pypokerengine.engine.poker_constants import PokerConstants as Const
 
 
@@ -21,6 +22,15 @@ class Player:
     self.action_histories = []
     self.pay_info = PayInfo()
 
+  # current street's histories, always kept as an ActionLog
+  @property
+  def action_histories(self):
+    return self.__action_histories
+
+  @action_histories.setter
+  def action_histories(self, histories):
+    self.__action_histories = ActionLog.of(histories)
+
   def add_holecard(self, cards):
     if len(self.hole_card) != 0:
       raise ValueError(self.__dup_hole_msg)
@@ -68,25 +78,32 @@ class Player:
 
   def save_street_action_histories(self, street_flg):
     self.round_action_histories[street_flg] = self.action_histories
-    self.action_histories = []
+    self.action_histories = ActionLog()
 
   def clear_action_histories(self):
     self.round_action_histories = self.__init_round_action_histories()
-    self.action_histories = []
+    self.action_histories = ActionLog()
 
   def clear_pay_info(self):
     self.pay_info = PayInfo()
 
   def paid_sum(self):
-    pay_history = [h for h in self.action_histories if h["action"] not in ["FOLD", "ANTE"]]
-    last_pay_history = pay_history[-1] if len(pay_history)!=0 else None
-    return last_pay_history["amount"] if last_pay_history else 0
+    return self.action_histories.paid_sum
+
+  # number of raises on the finished streets of this round
+  def finished_streets_raise_number(self):
+    raised_number = 0
+    for histories in self.round_action_histories:
+      if histories is None:
+        return raised_number
+      raised_number += ActionLog.of(histories).raise_count
+    return raised_number
 
   def serialize(self):
     hole = [card.to_id() for card in self.hole_card]
     return [
         self.name, self.uuid, self.stack, hole,\
-            self.action_histories[::], self.pay_info.serialize(), self.round_action_histories[::]
+            self.action_histories.copy(), self.pay_info.serialize(), self.round_action_histories[::]
     ]
 
   @classmethod
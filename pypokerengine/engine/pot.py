@@ -0,0 +1,69 @@
+import bisect
+
+from pypokerengine.engine.pay_info import PayInfo
+
+class Pot:
+
+  # Chips put in during the current round. RoundManager updates it whenever chips
+  # move, so reading the pot does not go through every player's pay_info.
+  # Each all-in amount opens a side pot: capped_sums[k] is the sum over players of
+  # min(allin_amounts[k], paid amount), and a side pot is the difference of neighbours.
+  def __init__(self):
+    self.amount = 0
+    self.max_pay = 0
+    self.allin_amounts = []
+    self.capped_sums = []
+
+  # a player who already paid paid_amount this round puts in amount more
+  def add_pay(self, paid_amount, amount):
+    new_paid_amount = paid_amount + amount
+    self.amount += amount
+    self.max_pay = max(self.max_pay, new_paid_amount)
+    for k in range(bisect.bisect_right(self.allin_amounts, paid_amount), len(self.allin_amounts)):
+      self.capped_sums[k] += min(self.allin_amounts[k], new_paid_amount) - paid_amount
+
+  def add_allin(self, players, allin_amount):
+    k = bisect.bisect_right(self.allin_amounts, allin_amount)
+    self.allin_amounts.insert(k, allin_amount)
+    self.capped_sums.insert(k, sum([min(allin_amount, player.pay_info.amount) for player in players]))
+
+  def has_side_pot(self):
+    return len(self.allin_amounts) != 0
+
+  # (amount, eligible player indices) of every side pot in all-in order and then the main pot
+  def gen_pots(self, players):
+    pots = []
+    pot_sum = 0
+    for allin_amount, capped_sum in zip(self.allin_amounts, self.capped_sums):
+      eligibles = [idx for idx, player in enumerate(players) if self.__is_eligible(player, allin_amount)]
+      pots.append((capped_sum - pot_sum, eligibles))
+      pot_sum = capped_sum
+
+    main_eligibles = [idx for idx, player in enumerate(players) if player.pay_info.amount == self.max_pay]
+    pots.append((self.amount - pot_sum, main_eligibles))
+    return pots
+
+  # serialize format : [amount, max_pay, allin_amounts, capped_sums]
+  def serialize(self):
+    return [self.amount, self.max_pay, self.allin_amounts[::], self.capped_sums[::]]
+
+  @classmethod
+  def deserialize(self, serial):
+    pot = self()
+    pot.amount, pot.max_pay = serial[0], serial[1]
+    pot.allin_amounts, pot.capped_sums = serial[2][::], serial[3][::]
+    return pot
+
+  @classmethod
+  def from_players(self, players):
+    pot = self()
+    for player in players:
+      pot.add_pay(0, player.pay_info.amount)
+    for player in players:
+      if player.pay_info.status == PayInfo.ALLIN:
+        pot.add_allin(players, player.pay_info.amount)
+    return pot
+
+  def __is_eligible(self, player, allin_amount):
+    return player.pay_info.amount >= allin_amount and \
+        player.pay_info.status != PayInfo.FOLDED
@@ -7,20 +7,24 @@ from pypokerengine.engine.poker_constants import PokerConstants as Const
 from pypokerengine.engine.action_checker import ActionChecker
 from pypokerengine.engine.game_evaluator import GameEvaluator
 from pypokerengine.engine.message_builder import MessageBuilder
+from pypokerengine.utils.profiler import profiled
 
 class RoundManager:
 
+  # notifications is the set of notification message types to build, None builds all of them.
+  # Ask messages are always built.
+  # profiler, when given, records the "message_build" and "showdown" phases of the round.
   @classmethod
-  def start_new_round(self, round_count, small_blind_amount, ante_amount, table):
-    _state = self.__gen_initial_state(round_count, small_blind_amount, table)
+  def start_new_round(self, round_count, small_blind_amount, ante_amount, table, notifications=None, profiler=None):
+    _state = self.__gen_initial_state(round_count, small_blind_amount, table, notifications, profiler)
     state = self.__deep_copy_state(_state)
     table = state["table"]
 
     table.deck.shuffle()
-    self.__correct_ante(ante_amount, table.seats.players)
+    self.__correct_ante(ante_amount, table)
     self.__correct_blind(small_blind_amount, table)
     self.__deal_holecard(table.deck, table.seats.players)
-    start_msg = self.__round_start_message(round_count, table)
+    start_msg = self.__round_start_message(state)
     state, street_msgs = self.__start_street(state)
     return state, start_msg + street_msgs
 
@@ -33,37 +37,39 @@ class RoundManager:
       [player.save_street_action_histories(state["street"]) for player in state["table"].seats.players]
       state["street"] += 1
       state, street_msgs = self.__start_street(state)
-      return state, [update_msg] + street_msgs
+      return state, update_msg + street_msgs
     else:
       state["next_player"] = state["table"].next_ask_waiting_player_pos(state["next_player"])
       next_player_pos = state["next_player"]
       next_player = state["table"].seats.players[next_player_pos]
-      ask_message = (next_player.uuid, MessageBuilder.build_ask_message(next_player_pos, state))
-      return state, [update_msg, ask_message]
+      ask_message = (next_player.uuid, self.__build_message(state, MessageBuilder.build_ask_message, next_player_pos, state))
+      return state, update_msg + [ask_message]
 
 
 
 
   @classmethod
-  def __correct_ante(self, ante_amount, players):
+  def __correct_ante(self, ante_amount, table):
     if ante_amount == 0: return
-    active_players = [player for player in players if player.is_active()]
+    active_players = [player for player in table.seats.players if player.is_active()]
     for player in active_players:
       player.collect_bet(ante_amount)
+      table.pot.add_pay(player.pay_info.amount, ante_amount)
       player.pay_info.update_by_pay(ante_amount)
       player.add_action_history(Const.Action.ANTE, ante_amount)
 
   @classmethod
   def __correct_blind(self, sb_amount, table):
-    self.__blind_transaction(table.seats.players[table.sb_pos()], True, sb_amount)
-    self.__blind_transaction(table.seats.players[table.bb_pos()], False, sb_amount)
+    self.__blind_transaction(table, table.seats.players[table.sb_pos()], True, sb_amount)
+    self.__blind_transaction(table, table.seats.players[table.bb_pos()], False, sb_amount)
 
   @classmethod
-  def __blind_transaction(self, player, small_blind, sb_amount):
+  def __blind_transaction(self, table, player, small_blind, sb_amount):
     action = Const.Action.SMALL_BLIND if small_blind else Const.Action.BIG_BLIND
     blind_amount = sb_amount if small_blind else sb_amount*2
     player.collect_bet(blind_amount)
     player.add_action_history(action, sb_amount=sb_amount)
+    table.pot.add_pay(player.pay_info.amount, blind_amount)
     player.pay_info.update_by_pay(blind_amount)
 
   @classmethod
@@ -113,12 +119,15 @@ class RoundManager:
 
   @classmethod
   def __showdown(self, state):
-    winners, hand_info, prize_map = GameEvaluator.judge(state["table"])
+    winners, hand_info, prize_map = profiled(state.get("profiler"), "showdown", GameEvaluator.judge, state["table"])
     self.__prize_to_winners(state["table"].seats.players, prize_map)
-    result_message = MessageBuilder.build_round_result_message(state["round_count"], winners, hand_info, state)
+    result_message = []
+    if self.__is_notified(state, MessageBuilder.ROUND_RESULT_MESSAGE):
+      result_message = [(-1, self.__build_message(state,
+        MessageBuilder.build_round_result_message, state["round_count"], winners, hand_info, state))]
     state["table"].reset()
     state["street"] += 1
-    return state, [(-1, result_message)]
+    return state, result_message
 
   @classmethod
   def __prize_to_winners(self, players, prize_map):
@@ -126,16 +135,20 @@ class RoundManager:
       players[idx].append_chip(prize)
 
   @classmethod
-  def __round_start_message(self, round_count, table):
+  def __round_start_message(self, state):
+    if not self.__is_notified(state, MessageBuilder.ROUND_START_MESSAGE): return []
+    round_count, table = state["round_count"], state["table"]
     players = table.seats.players
-    gen_msg = lambda idx: (players[idx].uuid, MessageBuilder.build_round_start_message(round_count, idx, table.seats))
+    gen_msg = lambda idx: (players[idx].uuid,
+        self.__build_message(state, MessageBuilder.build_round_start_message, round_count, idx, table.seats))
     return reduce(lambda acc, idx: acc + [gen_msg(idx)], range(len(players)), [])
 
   @classmethod
   def __forward_street(self, state):
     table = state["table"]
-    street_start_msg = [(-1, MessageBuilder.build_street_start_message(state))]
-    if table.seats.count_active_players() == 1: street_start_msg = []
+    street_start_msg = []
+    if table.seats.count_active_players() != 1 and self.__is_notified(state, MessageBuilder.STREET_START_MESSAGE):
+      street_start_msg = [(-1, self.__build_message(state, MessageBuilder.build_street_start_message, state))]
     if table.seats.count_ask_wait_players() <= 1:
       state["street"] += 1
       state, messages = self.__start_street(state)
@@ -143,7 +156,7 @@ class RoundManager:
     else:
       next_player_pos = state["next_player"]
       next_player = table.seats.players[next_player_pos]
-      ask_message = [(next_player.uuid, MessageBuilder.build_ask_message(next_player_pos, state))]
+      ask_message = [(next_player.uuid, self.__build_message(state, MessageBuilder.build_ask_message, next_player_pos, state))]
       return state, street_start_msg + ask_message
 
   @classmethod
@@ -170,10 +183,10 @@ class RoundManager:
   def __accept_action(self, state, action, bet_amount):
     player = state["table"].seats.players[state["next_player"]]
     if action == 'call':
-      self.__chip_transaction(player, bet_amount)
+      self.__chip_transaction(state["table"], player, bet_amount)
       player.add_action_history(Const.Action.CALL, bet_amount)
     elif action == 'raise':
-      self.__chip_transaction(player, bet_amount)
+      self.__chip_transaction(state["table"], player, bet_amount)
       add_amount = bet_amount - ActionChecker.agree_amount(state["table"].seats.players)
       player.add_action_history(Const.Action.RAISE, bet_amount, add_amount)
     elif action == 'fold':
@@ -184,15 +197,28 @@ class RoundManager:
     return state
 
   @classmethod
-  def __chip_transaction(self, player, bet_amount):
+  def __chip_transaction(self, table, player, bet_amount):
     need_amount = ActionChecker.need_amount_for_action(player, bet_amount)
     player.collect_bet(need_amount)
+    table.pot.add_pay(player.pay_info.amount, need_amount)
     player.pay_info.update_by_pay(need_amount)
+    if player.pay_info.status == PayInfo.ALLIN:
+      table.pot.add_allin(table.seats.players, player.pay_info.amount)
 
   @classmethod
   def __update_message(self, state, action, bet_amount):
-    return (-1, MessageBuilder.build_game_update_message(
-      state["next_player"], action, bet_amount, state))
+    if not self.__is_notified(state, MessageBuilder.GAME_UPDATE_MESSAGE): return []
+    return [(-1, self.__build_message(state, MessageBuilder.build_game_update_message,
+      state["next_player"], action, bet_amount, state))]
+
+  @classmethod
+  def __build_message(self, state, builder, *args):
+    return profiled(state.get("profiler"), "message_build", builder, *args)
+
+  @classmethod
+  def __is_notified(self, state, message_type):
+    notifications = state.get("notifications")
+    return notifications is None or message_type in notifications
 
   @classmethod
   def __is_everyone_agreed(self, state):
@@ -223,22 +249,28 @@ class RoundManager:
         or player.pay_info.status in [PayInfo.FOLDED, PayInfo.ALLIN]
 
   @classmethod
-  def __gen_initial_state(self, round_count, small_blind_amount, table):
+  def __gen_initial_state(self, round_count, small_blind_amount, table, notifications, profiler):
     return {
         "round_count": round_count,
         "small_blind_amount": small_blind_amount,
         "street": Const.Street.PREFLOP,
         "next_player": table.next_ask_waiting_player_pos(table.bb_pos()),
-        "table": table
+        "table": table,
+        "notifications": notifications,
+        "profiler": profiler
     }
 
   @classmethod
   def __deep_copy_state(self, state):
-    table_deepcopy = Table.deserialize(state["table"].serialize())
+    # the copy is the live table of the round, so it keeps shuffling from the same stream
+    table = state["table"]
+    table_deepcopy = Table.deserialize(table.serialize(), rng=table.deck.rng)
     return {
         "round_count": state["round_count"],
         "small_blind_amount": state["small_blind_amount"],
         "street": state["street"],
         "next_player": state["next_player"],
-        "table": table_deepcopy
+        "table": table_deepcopy,
+        "notifications": state.get("notifications"),
+        "profiler": state.get("profiler")
         }
@@ -1,15 +1,17 @@
 from pypokerengine.engine.card import Card
 from pypokerengine.engine.seats import Seats
 from pypokerengine.engine.deck import Deck
+from pypokerengine.engine.pot import Pot
 
 class Table:
 
-  def __init__(self, cheat_deck=None):
+  def __init__(self, cheat_deck=None, rng=None):
     self.dealer_btn = 0
     self._blind_pos = None
     self.seats = Seats()
-    self.deck = cheat_deck if cheat_deck else Deck()
+    self.deck = cheat_deck if cheat_deck else Deck(rng=rng)
     self._community_card = []
+    self.pot = Pot()
 
   def set_blind_pos(self, sb_pos, bb_pos):
     self._blind_pos = [sb_pos, bb_pos]
@@ -33,11 +35,16 @@ class Table:
   def reset(self):
     self.deck.restore()
     self._community_card = []
+    self.pot = Pot()
     for player in self.seats.players:
       player.clear_holecard()
       player.clear_action_histories()
       player.clear_pay_info()
 
+  # recount the pot from the players' pay_info, needed after the seats are replaced
+  def refresh_pot(self):
+    self.pot = Pot.from_players(self.seats.players)
+
   def shift_dealer_btn(self):
     self.dealer_btn = self.next_active_player_pos(self.dealer_btn)
 
@@ -51,18 +58,24 @@ class Table:
     community_card = [card.to_id() for card in self._community_card]
     return [
         self.dealer_btn, Seats.serialize(self.seats),
-        Deck.serialize(self.deck), community_card, self._blind_pos
+        Deck.serialize(self.deck), community_card, self._blind_pos,
+        self.pot.serialize()
     ]
 
   @classmethod
-  def deserialize(self, serial):
-    deck = Deck.deserialize(serial[2])
+  def deserialize(self, serial, rng=None):
+    deck = Deck.deserialize(serial[2], rng=rng)
     community_card = [Card.from_id(cid) for cid in serial[3]]
     table = self(cheat_deck=deck)
     table.dealer_btn = serial[0]
     table.seats = Seats.deserialize(serial[1])
     table._community_card = community_card
     table._blind_pos = serial[4]
+    # states serialized without the pot recount it from the players
+    if len(serial) > 5:
+      table.pot = Pot.deserialize(serial[5])
+    else:
+      table.refresh_pot()
     return table
 
   def __find_entitled_player_pos(self, start_pos, check_method):
@@ -1,3 +1,5 @@
+import random
+
 class BasePokerPlayer(object):
   """Base Poker client implementation
 
@@ -12,6 +14,15 @@ class BasePokerPlayer(object):
   - receive_round_result_message
   """
 
+  # random source for the player's decisions, the Dealer sets a per-game stream when the game is seeded
+  rng = random
+
+  # notification message types the player reads, None is every type.
+  # Players whose receive_* methods do nothing declare fewer, eg frozenset(),
+  # and a quiet Dealer does not even build the types nobody reads. Subclasses
+  # that read more types than their parent have to declare them again.
+  notifications = None
+
   def __init__(self):
     pass
 
@@ -42,6 +53,13 @@ class BasePokerPlayer(object):
   def set_uuid(self, uuid):
     self.uuid = uuid
 
+  def set_rng(self, rng):
+    self.rng = rng
+
+  def subscribed_notifications(self):
+    """Notification message types this player wants to receive, None for every type"""
+    return set(self.notifications) if self.notifications is not None else None
+
   def respond_to_ask(self, message):
     """Called from Dealer when ask message received from RoundManager"""
     valid_actions, hole_card, round_state = self.__parse_ask_message(message)
@@ -106,4 +124,3 @@ class BasePokerPlayer(object):
     hand_info = message["hand_info"]
     round_state = message["round_state"]
     return winners, hand_info, round_state
-
@@ -0,0 +1,64 @@
+import numpy as np
+
+from pypokerengine.engine.hand_evaluator import HandEvaluator
+
+# rank (2..14, ace high) and suit index of every card id, index 0 is unused
+_ids = np.arange(53)
+ID_TO_RANK = np.where((_ids - 1) % 13 == 0, 14, (_ids - 1) % 13 + 1)
+ID_TO_SUIT = (_ids - 1) // 13
+ID_TO_RANK[0], ID_TO_SUIT[0] = 0, 0
+
+_RANKS = np.arange(15)
+
+def eval_hands(hole_ids, community_ids):
+    """HandEvaluator.eval_hand for a batch of hands.
+
+    hole_ids is an (N, 2) and community_ids an (N, 5) array of card ids. Returns an
+    int64 array with exactly the scores HandEvaluator.eval_hand gives, including its
+    tie breaks on the hole cards.
+    """
+    hole_ids = np.asarray(hole_ids)
+    cards = np.concatenate([hole_ids, np.asarray(community_ids)], axis=1)
+    ranks = ID_TO_RANK[cards]
+    suits = ID_TO_SUIT[cards]
+
+    counts = (ranks[:, :, None] == _RANKS).sum(axis=1)   # (N, 15) cards per rank
+    present = counts > 0
+
+    suit_counts = (suits[:, :, None] == np.arange(4)).sum(axis=1)
+    has_flush = suit_counts.max(axis=1) >= 5
+    flush_suit = suit_counts.argmax(axis=1)
+    flush_cards = suits == flush_suit[:, None]
+    flush_present = ((ranks[:, :, None] == _RANKS) & flush_cards[:, :, None]).any(axis=1) & has_flush[:, None]
+
+    straight = _lowest_rank_of_best_straight(present)
+    straight_flush = _lowest_rank_of_best_straight(flush_present)
+    four = _highest_rank(counts >= 4)
+    three = _highest_rank(counts >= 3)
+    pair = _highest_rank(counts >= 2)
+    # second pair or second three of a kind, for full house and two pair
+    second_pair = _highest_rank((counts >= 2) & (_RANKS != np.where(three > 0, three, pair)[:, None]))
+    flush_high = _highest_rank(flush_present)
+
+    hole_ranks = np.sort(ID_TO_RANK[hole_ids], axis=1)
+    hole_flg = hole_ranks[:, 1] << 4 | hole_ranks[:, 0]
+
+    # same precedence as HandEvaluator.__calc_hand_info_flg, the first match wins
+    hand_flg = np.select(
+        [straight_flush > 0, four > 0, (three > 0) & (second_pair > 0), has_flush, straight > 0,
+            three > 0, (pair > 0) & (second_pair > 0), pair > 0],
+        [HandEvaluator.STRAIGHTFLASH | straight_flush << 4, HandEvaluator.FOURCARD | four << 4,
+            HandEvaluator.FULLHOUSE | three << 4 | second_pair, HandEvaluator.FLASH | flush_high << 4,
+            HandEvaluator.STRAIGHT | straight << 4, HandEvaluator.THREECARD | three << 4,
+            HandEvaluator.TWOPAIR | pair << 4 | second_pair, HandEvaluator.ONEPAIR | pair << 4],
+        default=hole_flg)
+    return (hand_flg.astype(np.int64) << 8) | hole_flg
+
+# highest rank where mask is set, 0 when none is
+def _highest_rank(mask):
+    return (mask * _RANKS).max(axis=1)
+
+# like HandEvaluator.__search_straight: no wheel, the ace only counts high
+def _lowest_rank_of_best_straight(present):
+    run = present[:, 2:11] & present[:, 3:12] & present[:, 4:13] & present[:, 5:14] & present[:, 6:15]
+    return _highest_rank(np.pad(run, ((0, 0), (2, 4))))
@@ -0,0 +1,379 @@
+from array import array
+
+from pypokerengine.engine.table import Table
+from pypokerengine.engine.seats import Seats
+from pypokerengine.engine.card import Card
+from pypokerengine.engine.deck import Deck
+from pypokerengine.engine.player import Player
+from pypokerengine.engine.pay_info import PayInfo
+from pypokerengine.engine.action_log import ActionLog
+from pypokerengine.engine.action_checker import ActionChecker
+from pypokerengine.engine.round_manager import RoundManager
+from pypokerengine.engine.poker_constants import PokerConstants as Const
+from pypokerengine.utils.rng_utils import DeferredClone
+
+# header layout of GameStateSnapshot.ints
+ROUND_COUNT, SMALL_BLIND_AMOUNT, STREET, NEXT_PLAYER, DEALER_BTN, SB_POS, BB_POS, PLAYER_NUM, DECK_SIZE = range(9)
+HEADER_SIZE = 9
+
+# layout of each player's block that follows the header, the betting fields are the
+# aggregates of the player's ActionLog on the current street
+STACK, PAY_AMOUNT, PAY_STATUS, HOLE_CARD1, HOLE_CARD2, \
+    PAID_SUM, ACTION_NUM, FIRST_ACTION, LAST_RAISE, LAST_RAISE_ADD, RAISE_NUM, \
+    FINISHED_RAISE_NUM, SAVED_STREETS = range(13)
+PLAYER_SIZE = 13
+
+# layout of each action history in GameStateSnapshot.action_log
+LOG_STREET, LOG_PLAYER, LOG_KIND, LOG_AMOUNT, LOG_PAID, LOG_ADD_AMOUNT = range(6)
+LOG_ENTRY_SIZE = 6
+
+# history kinds, in the order of the keys their history dicts have
+KINDS = [Player.ACTION_FOLD_STR, Player.ACTION_CALL_STR, Player.ACTION_RAISE_STR,
+    Player.ACTION_SMALL_BLIND, Player.ACTION_BIG_BLIND, Player.ACTION_ANTE]
+FOLD, CALL, RAISE, SMALL_BLIND, BIG_BLIND, ANTE = range(6)
+_KIND_CODES = { kind: code for code, kind in enumerate(KINDS) }
+_KIND_KEYS = [(), ("amount", "paid"), ("amount", "paid", "add_amount"),
+    ("amount", "add_amount"), ("amount", "add_amount"), ("amount",)]
+
+_NONE = -1
+_NOT_FOUND = -2   # Table._player_not_found
+
+class GameStateSnapshot(object):
+    """Compact flat copy of a game_state for tree search.
+
+    Numbers live in one array of ints with a fixed layout (header, then one block
+    per player) and every action history of the round is one fixed size entry of
+    the action_log int array. Community cards and the deck are byte strings that
+    are replaced, never changed. clone() copies the two arrays and to_game_state()
+    builds the engine objects back only when they are needed.
+
+    apply_action plays an action on the arrays with the betting rules of
+    RoundManager and ActionChecker, dealing the community cards of the next streets
+    from the deck bytes. Only the action that ends the round (showdown or the last
+    fold) goes through RoundManager, no messages are built.
+    """
+
+    def __init__(self, ints, action_log, community_card, deck, players_info, rng=None):
+        self.ints = ints
+        self.action_log = action_log
+        self.community_card = community_card
+        self.deck = deck                                 # [cheat, cheat_card_ids, card ids], first DECK_SIZE undrawn
+        self.players_info = players_info                 # ((name, uuid), ...)
+        self.rng = rng                                   # deck stream of the game, never drawn from
+
+    @classmethod
+    def take(self, game_state):
+        table = game_state["table"]
+        players = table.seats.players
+        blind_pos = table._blind_pos if table._blind_pos is not None else [_NONE, _NONE]
+        deck = table.deck.serialize()
+        ints = array("i", [
+            game_state["round_count"], game_state["small_blind_amount"], game_state["street"],
+            _none_to_int(game_state["next_player"]), table.dealer_btn, blind_pos[0], blind_pos[1],
+            len(players), len(deck[2])
+            ])
+        action_log = array("i")
+        for idx, player in enumerate(players):
+            ints.extend(_player_block(player))
+            for street, histories in enumerate(player.round_action_histories):
+                if histories is not None: _log_histories(action_log, street, idx, histories)
+            _log_histories(action_log, game_state["street"], idx, player.action_histories)
+        return self(
+                ints,
+                action_log,
+                bytes([card.to_id() for card in table.get_community_card()]),
+                deck,
+                tuple([(player.name, player.uuid) for player in players]),
+                table.deck.rng
+                )
+
+    def clone(self):
+        return GameStateSnapshot(self.ints[:], self.action_log[:], self.community_card,
+                self.deck, self.players_info, self.rng)
+
+    def to_game_state(self):
+        ints = self.ints
+        # every game state built shuffles from its own clone, the game's stream never moves
+        deck = [self.deck[0], self.deck[1], self.deck[2][:ints[DECK_SIZE]]]
+        table = Table(cheat_deck=Deck.deserialize(deck, rng=DeferredClone(self.rng) if self.rng else None))
+        table.dealer_btn = ints[DEALER_BTN]
+        if ints[SB_POS] != _NONE: table.set_blind_pos(ints[SB_POS], ints[BB_POS])
+        table._community_card = [Card.from_id(cid) for cid in self.community_card]
+        table.seats = Seats()
+        histories = self.__build_histories()
+        for idx in range(ints[PLAYER_NUM]):
+            table.seats.players.append(self.__build_player(idx, histories[idx]))
+        table.refresh_pot()
+        return {
+                "round_count": ints[ROUND_COUNT],
+                "small_blind_amount": ints[SMALL_BLIND_AMOUNT],
+                "street": ints[STREET],
+                "next_player": _int_to_none(ints[NEXT_PLAYER]),
+                "table": table
+                }
+
+    def stack(self, player_pos):
+        return self.ints[HEADER_SIZE + PLAYER_SIZE * player_pos + STACK]
+
+    def is_round_finished(self):
+        return self.ints[STREET] == Const.Street.FINISHED
+
+    def apply_action(self, action):
+        """Play action ("fold", "call" or "raise") of the next player on this snapshot"""
+        ints = self.ints
+        if ints[STREET] > Const.Street.RIVER:
+            return self.__apply_by_round_manager(action)
+        if action not in ("fold", "call", "raise"):
+            raise ValueError("Unexpected action %s received" % action)
+
+        before = (ints[:], len(self.action_log), self.community_card)
+        self.__accept_action(action)
+        if not self.__is_everyone_agreed():
+            ints[NEXT_PLAYER] = self.__next_ask_waiting_player_pos(ints[NEXT_PLAYER])
+            return
+        self.__save_street()
+        ints[STREET] += 1
+        if not self.__start_street():
+            # the round ends, RoundManager judges the showdown and pays the prizes
+            self.ints, log_size, self.community_card = before
+            del self.action_log[log_size:]
+            self.__apply_by_round_manager(action)
+
+    # ActionChecker.correct_action and RoundManager.__accept_action on the arrays
+    def __accept_action(self, action):
+        ints = self.ints
+        pos = ints[NEXT_PLAYER]
+        block = HEADER_SIZE + PLAYER_SIZE * pos
+        sb_amount = ints[SMALL_BLIND_AMOUNT]
+        agree_amount, min_raise_amount = self.__last_raise()
+        raise_amount, _ = ActionChecker.round_raise_amount(sb_amount, ints[STREET])
+        if action == "raise":
+            amount = agree_amount + raise_amount
+        elif action == "call":
+            amount = agree_amount
+        else:
+            amount = 0
+
+        stack, paid_sum = ints[block + STACK], ints[block + PAID_SUM]
+        is_allin = (action == "call" and amount >= stack + paid_sum) or \
+                (action == "raise" and amount == stack + paid_sum)
+        if is_allin:
+            amount = stack + paid_sum
+        elif action != "fold" and (stack < amount - paid_sum or \
+                (action == "call" and amount != agree_amount) or \
+                (action == "raise" and min_raise_amount > amount)):
+            action, amount = "fold", 0
+
+        if action == "fold":
+            ints[block + PAY_STATUS] = PayInfo.FOLDED
+            self.__add_history(pos, FOLD, 0, 0, 0)
+            return
+        need_amount = amount - paid_sum
+        ints[block + STACK] -= need_amount
+        ints[block + PAY_AMOUNT] += need_amount
+        if is_allin: ints[block + PAY_STATUS] = PayInfo.ALLIN
+        if action == "call":
+            self.__add_history(pos, CALL, amount, need_amount, 0)
+        else:
+            self.__add_history(pos, RAISE, amount, need_amount, amount - agree_amount)
+
+    # what ActionLog.append keeps track of
+    def __add_history(self, pos, kind, amount, paid, add_amount):
+        ints = self.ints
+        block = HEADER_SIZE + PLAYER_SIZE * pos
+        self.action_log.extend([ints[STREET], pos, kind, amount, paid, add_amount])
+        if ints[block + ACTION_NUM] == 0: ints[block + FIRST_ACTION] = kind
+        ints[block + ACTION_NUM] += 1
+        if kind != FOLD:
+            ints[block + PAID_SUM] = amount
+        if kind == RAISE:
+            ints[block + RAISE_NUM] += 1
+            if ints[block + LAST_RAISE] == _NONE or amount > ints[block + LAST_RAISE]:
+                ints[block + LAST_RAISE], ints[block + LAST_RAISE_ADD] = amount, add_amount
+
+    # agree amount and min raise amount of ActionChecker
+    def __last_raise(self):
+        ints = self.ints
+        last_raise, last_raise_add = _NONE, 0
+        for block in self.__blocks():
+            if ints[block + LAST_RAISE] > last_raise:
+                last_raise, last_raise_add = ints[block + LAST_RAISE], ints[block + LAST_RAISE_ADD]
+        if last_raise == _NONE:
+            return 0, ints[SMALL_BLIND_AMOUNT] * 2
+        return last_raise, last_raise + last_raise_add
+
+    # RoundManager.__is_everyone_agreed
+    def __is_everyone_agreed(self):
+        ints = self.ints
+        blocks = self.__blocks()
+        max_pay = max([ints[block + PAID_SUM] for block in blocks])
+        active_num = len([block for block in blocks if ints[block + PAY_STATUS] != PayInfo.FOLDED])
+        if active_num == 0:
+            raise ValueError("[__is_everyone_agreed] no-active-players!!")
+        if all([self.__is_agreed(max_pay, block) for block in blocks]) or active_num == 1:
+            return True
+
+        next_pos = self.__next_ask_waiting_player_pos(ints[NEXT_PLAYER])
+        if next_pos == _NOT_FOUND: return False
+        next_block = HEADER_SIZE + PLAYER_SIZE * next_pos
+        return self.__count_ask_wait_players() == 1 and ints[next_block + PAID_SUM] == max_pay
+
+    def __is_agreed(self, max_pay, block):
+        ints = self.ints
+        if ints[block + PAY_STATUS] in [PayInfo.FOLDED, PayInfo.ALLIN]: return True
+        # BigBlind should be asked action at least once
+        is_preflop = not ints[block + SAVED_STREETS] & 1
+        bb_ask_once = ints[block + ACTION_NUM] == 1 and ints[block + FIRST_ACTION] == BIG_BLIND
+        return (not is_preflop or not bb_ask_once) and ints[block + PAID_SUM] == max_pay \
+                and ints[block + ACTION_NUM] != 0
+
+    # Player.save_street_action_histories of every player
+    def __save_street(self):
+        ints = self.ints
+        for block in self.__blocks():
+            ints[block + SAVED_STREETS] |= 1 << ints[STREET]
+            ints[block + FINISHED_RAISE_NUM] += ints[block + RAISE_NUM]
+            ints[block + PAID_SUM] = ints[block + ACTION_NUM] = ints[block + RAISE_NUM] = 0
+            ints[block + FIRST_ACTION] = ints[block + LAST_RAISE] = _NONE
+            ints[block + LAST_RAISE_ADD] = 0
+
+    # RoundManager.__start_street for the streets after preflop, False at the showdown
+    def __start_street(self):
+        ints = self.ints
+        while ints[STREET] != Const.Street.SHOWDOWN:
+            ints[NEXT_PLAYER] = self.__next_ask_waiting_player_pos(ints[SB_POS] - 1)
+            self.__draw_community_card(3 if ints[STREET] == Const.Street.FLOP else 1)
+            if self.__count_ask_wait_players() > 1: return True
+            ints[STREET] += 1
+        return False
+
+    # cards are drawn from the end of the undrawn ids
+    def __draw_community_card(self, num):
+        size = self.ints[DECK_SIZE]
+        self.community_card += self.deck[2][size - num:size][::-1]
+        self.ints[DECK_SIZE] = size - num
+
+    def __next_ask_waiting_player_pos(self, start_pos):
+        ints = self.ints
+        player_num = ints[PLAYER_NUM]
+        for offset in range(1, player_num + 1):
+            pos = (start_pos + offset) % player_num
+            if ints[HEADER_SIZE + PLAYER_SIZE * pos + PAY_STATUS] == PayInfo.PAY_TILL_END: return pos
+        return _NOT_FOUND
+
+    def __count_ask_wait_players(self):
+        ints = self.ints
+        return len([block for block in self.__blocks() if ints[block + PAY_STATUS] == PayInfo.PAY_TILL_END])
+
+    def __blocks(self):
+        return range(HEADER_SIZE, HEADER_SIZE + PLAYER_SIZE * self.ints[PLAYER_NUM], PLAYER_SIZE)
+
+    def __apply_by_round_manager(self, action):
+        game_state = self.to_game_state()
+        game_state["notifications"] = set()
+        next_state, _ = RoundManager.apply_action(game_state, action)
+        snapshot = GameStateSnapshot.take(next_state)
+        self.ints, self.action_log = snapshot.ints, snapshot.action_log
+        self.community_card, self.deck = snapshot.community_card, snapshot.deck
+
+    # [[histories of street 0..3, histories of the current street] per player] from the log
+    def __build_histories(self):
+        log = self.action_log
+        histories = [[[] for _ in range(5)] for _ in range(self.ints[PLAYER_NUM])]
+        for entry in range(0, len(log), LOG_ENTRY_SIZE):
+            pos, kind = log[entry + LOG_PLAYER], log[entry + LOG_KIND]
+            block = HEADER_SIZE + PLAYER_SIZE * pos
+            street = log[entry + LOG_STREET]
+            slot = street if street < 4 and self.ints[block + SAVED_STREETS] & 1 << street else 4
+            history = { "action": KINDS[kind] }
+            for key, offset in zip(("amount", "paid", "add_amount"), (LOG_AMOUNT, LOG_PAID, LOG_ADD_AMOUNT)):
+                if key in _KIND_KEYS[kind]: history[key] = log[entry + offset]
+            history["uuid"] = self.players_info[pos][1]
+            histories[pos][slot].append(history)
+        return histories
+
+    def __build_player(self, idx, histories):
+        block = HEADER_SIZE + PLAYER_SIZE * idx
+        ints = self.ints
+        name, uuid = self.players_info[idx]
+        player = Player(uuid, ints[block + STACK], name)
+        if ints[block + HOLE_CARD1]:
+            player.hole_card = [Card.from_id(ints[block + HOLE_CARD1]), Card.from_id(ints[block + HOLE_CARD2])]
+        player.pay_info = PayInfo(ints[block + PAY_AMOUNT], ints[block + PAY_STATUS])
+        player.action_histories = ActionLog(histories[4])
+        player.round_action_histories = [ActionLog(histories[street]) if ints[block + SAVED_STREETS] & 1 << street else None
+                for street in range(4)]
+        return player
+
+
+class GameStateHistory(object):
+    """Apply, undo and redo actions during tree search on a GameStateSnapshot.
+
+    apply_action plays the action on the snapshot's arrays and keeps a clone of the
+    previous snapshot, so undo and redo only swap snapshots. game_state() builds the
+    engine objects of the current state when a node gets expanded.
+    """
+
+    def __init__(self, game_state):
+        self.snapshot = GameStateSnapshot.take(game_state)
+        self.__undo_snapshots = []
+        self.__redo_snapshots = []
+
+    def apply_action(self, action):
+        previous = self.snapshot.clone()
+        self.snapshot.apply_action(action)
+        self.__undo_snapshots.append(previous)
+        self.__redo_snapshots = []
+        return self.snapshot
+
+    def game_state(self):
+        return self.snapshot.to_game_state()
+
+    def can_undo(self):
+        return len(self.__undo_snapshots) != 0
+
+    def can_redo(self):
+        return len(self.__redo_snapshots) != 0
+
+    def undo(self):
+        if not self.can_undo(): raise Exception("There is no applied action to undo.")
+        self.__redo_snapshots.append(self.snapshot)
+        self.snapshot = self.__undo_snapshots.pop()
+        return self.snapshot
+
+    def redo(self):
+        if not self.can_redo(): raise Exception("There is no undone action to redo.")
+        self.__undo_snapshots.append(self.snapshot)
+        self.snapshot = self.__redo_snapshots.pop()
+        return self.snapshot
+
+    def depth(self):
+        return len(self.__undo_snapshots)
+
+
+def _player_block(player):
+    histories = player.action_histories
+    hole = [card.to_id() for card in player.hole_card] or [0, 0]
+    last_raise = histories.last_raise
+    saved_streets = sum([1 << street for street, saved in enumerate(player.round_action_histories) if saved is not None])
+    return [
+            player.stack, player.pay_info.amount, player.pay_info.status, hole[0], hole[1],
+            histories.paid_sum, len(histories), _KIND_CODES[histories[0]["action"]] if histories else _NONE,
+            last_raise["amount"] if last_raise else _NONE, last_raise["add_amount"] if last_raise else 0,
+            histories.raise_count, player.finished_streets_raise_number(), saved_streets
+            ]
+
+def _log_histories(action_log, street, player_pos, histories):
+    for history in histories:
+        action_log.extend([street, player_pos, _KIND_CODES[history["action"]],
+            history.get("amount", 0), history.get("paid", 0), history.get("add_amount", 0)])
+
+def _none_to_int(value):
+    if value is None: return _NONE
+    if value == Table._player_not_found: return _NOT_FOUND
+    return value
+
+def _int_to_none(value):
+    if value == _NONE: return None
+    if value == _NOT_FOUND: return Table._player_not_found
+    return value
@@ -0,0 +1,188 @@
+import gzip
+import os
+import struct
+from collections import namedtuple
+
+from pypokerengine.engine.table import Table
+from pypokerengine.engine.seats import Seats
+from pypokerengine.engine.deck import Deck
+from pypokerengine.engine.player import Player
+from pypokerengine.engine.pay_info import PayInfo
+from pypokerengine.engine.round_manager import RoundManager
+
+# File layout: MAGIC, then records of [type (1 byte), body size (4 bytes), body].
+# All numbers are little endian.
+#   game record : player num, then per seat the name and uuid as length prefixed utf-8
+#   round record: round count, small blind, ante, dealer button, sb pos, bb pos, player num,
+#                 (stack, pay status) per seat at the start of the round,
+#                 the dealt card ids in draw order (2 per seat, then 5 community cards),
+#                 action num and one byte per action, stack per seat after the round
+# An action byte is street << 6 | seat << 2 | action code, as the player declared it
+# (anything but call and raise as fold). It is logged once the engine applied the action.
+MAGIC = b"PPHH\x02"
+GAME_RECORD, ROUND_RECORD = 1, 2
+
+ACTIONS = ["fold", "call", "raise"]
+ACTION_CODES = { action: code for code, action in enumerate(ACTIONS) }
+_FOLD_CODE = ACTION_CODES["fold"]
+
+_RECORD_HEADER = struct.Struct("<BI")
+_ROUND_HEADER = struct.Struct("<IIIBBBB")
+_SEAT = struct.Struct("<iB")
+_ACTION_NUM = struct.Struct("<H")
+
+GameRecord = namedtuple("GameRecord", ["names", "uuids"])
+RoundRecord = namedtuple("RoundRecord", [
+    "round_count", "small_blind_amount", "ante", "dealer_btn", "sb_pos", "bb_pos",
+    "stacks", "pay_status", "card_ids", "actions", "result_stacks"])
+
+class HandHistoryWriter(object):
+    """Append-only binary log of the games and rounds a Dealer plays.
+
+    Records are buffered and appended to path, gzip compressed with compress=True
+    (every session then appends one gzip member, which readers see as one stream).
+    The Dealer calls begin_game once per game and begin_round, record_deal,
+    record_action and end_round for every round. Use it as a context manager or
+    call close() to flush.
+    """
+
+    def __init__(self, path, compress=False, buffer_size=1 << 16):
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if compress:
+            self.file = gzip.open(path, "ab")
+        else:
+            self.file = open(path, "ab", buffering=buffer_size)
+        if is_new: self.file.write(MAGIC)
+        self.__round = None
+
+    def begin_game(self, seats):
+        body = bytearray([len(seats.players)])
+        for player in seats.players:
+            for text in (player.name, player.uuid):
+                encoded = text.encode("utf-8")
+                if len(encoded) > 255:
+                    raise ValueError("Hand history keeps names and uuids up to 255 bytes, [%s] is %d bytes" % (text, len(encoded)))
+                body.append(len(encoded))
+                body += encoded
+        self.__write_record(GAME_RECORD, body)
+
+    def begin_round(self, round_count, small_blind_amount, ante, table):
+        players = table.seats.players
+        body = bytearray(_ROUND_HEADER.pack(round_count, small_blind_amount, ante,
+            table.dealer_btn, table.sb_pos(), table.bb_pos(), len(players)))
+        for player in players:
+            body += _SEAT.pack(player.stack, player.pay_info.status)
+        self.__round = (body, [])
+
+    # table right after RoundManager.start_new_round, before any community card is drawn
+    def record_deal(self, table):
+        body, _ = self.__round
+        for player in table.seats.players:
+            body += bytes([card.to_id() for card in player.hole_card])
+        # cards are drawn from the end of the undrawn ids
+        body += table.deck.serialize()[2][::-1][:5]
+
+    # state is the round state the action is declared in
+    def record_action(self, state, action):
+        code = ACTION_CODES.get(action, _FOLD_CODE)
+        self.__round[1].append(state["street"] << 6 | state["next_player"] << 2 | code)
+
+    def end_round(self, table):
+        body, actions = self.__round
+        body += _ACTION_NUM.pack(len(actions)) + bytes(actions)
+        for player in table.seats.players:
+            body += struct.pack("<i", player.stack)
+        self.__write_record(ROUND_RECORD, body)
+        self.__round = None
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __write_record(self, record_type, body):
+        self.file.write(_RECORD_HEADER.pack(record_type, len(body)))
+        self.file.write(body)
+
+
+def read_hand_history(path):
+    """Lazily yield the GameRecord and RoundRecord entries of a hand history file"""
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == b"\x1f\x8b"
+    with (gzip.open(path, "rb") if compressed else open(path, "rb")) as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("%s is not a hand history file" % path)
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if not header: return
+            record_type, size = _RECORD_HEADER.unpack(header)
+            body = f.read(size)
+            if len(body) != size:
+                raise ValueError("Hand history [%s] ends in the middle of a record" % path)
+            if record_type == GAME_RECORD:
+                yield _parse_game_record(body)
+            elif record_type == ROUND_RECORD:
+                yield _parse_round_record(body)
+            else:
+                raise ValueError("Unknown hand history record type [%d]" % record_type)
+
+def replay_round(game, record):
+    """Re-drive RoundManager through a logged round, returns the final round state"""
+    table = Table(cheat_deck=Deck(cheat=True, cheat_card_ids=list(record.card_ids)))
+    table.dealer_btn = record.dealer_btn
+    table.set_blind_pos(record.sb_pos, record.bb_pos)
+    table.seats = Seats()
+    for name, uuid, stack, status in zip(game.names, game.uuids, record.stacks, record.pay_status):
+        player = Player(uuid, stack, name)
+        player.pay_info = PayInfo(status=status)
+        table.seats.sitdown(player)
+    state, _ = RoundManager.start_new_round(record.round_count, record.small_blind_amount, record.ante, table, set())
+    for action in record.actions:
+        state, _ = RoundManager.apply_action(state, action)
+    return state
+
+def replay_hand_history(path, verify=True):
+    """Yield (game, round record, final round state) for every logged round.
+
+    With verify, a replay that does not end with the logged stacks raises ValueError.
+    """
+    game = None
+    for record in read_hand_history(path):
+        if isinstance(record, GameRecord):
+            game = record
+            continue
+        state = replay_round(game, record)
+        if verify:
+            stacks = tuple([player.stack for player in state["table"].seats.players])
+            if stacks != record.result_stacks:
+                raise ValueError("Replay of round %d ended with stacks %s instead of %s"
+                        % (record.round_count, stacks, record.result_stacks))
+        yield game, record, state
+
+def _parse_game_record(body):
+    texts, pos = [], 1
+    for _ in range(body[0] * 2):
+        size = body[pos]
+        texts.append(body[pos + 1:pos + 1 + size].decode("utf-8"))
+        pos += 1 + size
+    return GameRecord(tuple(texts[0::2]), tuple(texts[1::2]))
+
+def _parse_round_record(body):
+    round_count, small_blind_amount, ante, dealer_btn, sb_pos, bb_pos, player_num = _ROUND_HEADER.unpack_from(body)
+    pos = _ROUND_HEADER.size
+    seats = [_SEAT.unpack_from(body, pos + _SEAT.size * idx) for idx in range(player_num)]
+    pos += _SEAT.size * player_num
+    card_ids = body[pos:pos + 2 * player_num + 5]
+    pos += len(card_ids)
+    action_num, = _ACTION_NUM.unpack_from(body, pos)
+    pos += _ACTION_NUM.size
+    actions = tuple([ACTIONS[code & 3] for code in body[pos:pos + action_num]])
+    pos += action_num
+    result_stacks = struct.unpack_from("<%di" % player_num, body, pos)
+    return RoundRecord(round_count, small_blind_amount, ante, dealer_btn, sb_pos, bb_pos,
+            tuple([stack for stack, _ in seats]), tuple([status for _, status in seats]),
+            bytes(card_ids), actions, tuple(result_stacks))
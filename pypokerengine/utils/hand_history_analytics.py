@@ -0,0 +1,208 @@
+import gzip
+from collections import namedtuple
+
+import numpy as np
+
+from pypokerengine.engine.pay_info import PayInfo
+from pypokerengine.utils.hand_history import MAGIC, GAME_RECORD, ROUND_RECORD, _RECORD_HEADER, _parse_game_record
+
+FOLD, CALL, RAISE = 0, 1, 2
+
+# rounds: one row per round, with per seat fields as (seat num,) sub arrays
+# actions: one row per action in log order, round is the row index in rounds
+# players: player names, player_ids: (round num, seat num) index into players
+HandHistoryArrays = namedtuple("HandHistoryArrays", ["rounds", "actions", "players", "player_ids"])
+
+_ACTION_DTYPE = np.dtype([("round", np.int64), ("street", np.uint8), ("seat", np.uint8), ("action", np.uint8)])
+
+def load_hand_histories(paths):
+    """Load hand history files into structured NumPy arrays.
+
+    Uncompressed files are memory-mapped and only the record boundaries are
+    scanned in Python, every field is then gathered with vectorized indexing.
+    All rounds must have the same number of seats.
+    """
+    rounds, actions, players, player_ids = [], [], [], []
+    round_num = 0
+    for path in ([paths] if isinstance(paths, str) else paths):
+        data = _map_file(path)
+        game_offsets, round_offsets, round_games = _scan_records(data, path)
+        games = [_parse_game_record(bytes(data[offset:offset + size])) for offset, size in game_offsets]
+        if not round_offsets: continue
+        file_rounds, file_actions = _gather_rounds(data, np.array(round_offsets, dtype=np.int64))
+        file_actions["round"] += round_num
+        round_num += len(file_rounds)
+        rounds.append(file_rounds)
+        actions.append(file_actions)
+        game_player_ids = np.array([[_player_index(players, name) for name in game.names] for game in games])
+        player_ids.append(game_player_ids[np.array(round_games)])
+    if not rounds:
+        return HandHistoryArrays(np.zeros(0), np.zeros(0, dtype=_ACTION_DTYPE), players, np.zeros((0, 0), dtype=np.int64))
+    if len(set([r.dtype for r in rounds])) != 1:
+        raise ValueError("Hand histories with different numbers of seats can not be loaded together")
+    return HandHistoryArrays(np.concatenate(rounds), np.concatenate(actions), players, np.concatenate(player_ids))
+
+def player_stats(hands):
+    """{player name: hands, vpip, pfr, aggression, showdowns, showdown_win_rate, net, bb_per_100}
+
+    vpip and pfr count the hands where the player put chips in voluntarily or
+    raised preflop, aggression is raises / calls after the flop (checks are not
+    calls), and the showdown win rate is the share of showdowns that made a profit.
+    Actions are counted as the players declared them.
+    """
+    rounds, actions, player_ids = hands.rounds, hands.actions, hands.player_ids
+    player_num = len(hands.players)
+    dealt = rounds["pay_status"] != PayInfo.FOLDED
+    net = rounds["result_stack"] - rounds["stack"]
+
+    act_round, street, seat, action = actions["round"], actions["street"], actions["seat"], actions["action"]
+    prior_raises = _prior_count_in_street(act_round, street, action == RAISE)
+    check = (action == CALL) & (prior_raises == 0) & ((street != 0) | (seat == rounds["bb_pos"][act_round]))
+    preflop = street == 0
+    vpip = _flag_seats(rounds, actions, preflop & ((action == RAISE) | ((action == CALL) & ~check)))
+    pfr = _flag_seats(rounds, actions, preflop & (action == RAISE))
+    folded = _flag_seats(rounds, actions, action == FOLD)
+
+    reached = dealt & ~folded
+    showdown = reached & (reached.sum(axis=1) >= 2)[:, None]
+
+    count = lambda mask: np.bincount(player_ids[mask], minlength=player_num)
+    act_player = player_ids[act_round, seat]
+    count_actions = lambda mask: np.bincount(act_player[mask], minlength=player_num)
+    hand_num = count(dealt)
+    showdown_num = count(showdown)
+    raise_num = count_actions(~preflop & (action == RAISE))
+    call_num = count_actions(~preflop & (action == CALL) & ~check)
+    net_sum = np.bincount(player_ids[dealt], weights=net[dealt], minlength=player_num)
+    bb_sum = np.bincount(player_ids[dealt], weights=(net / (2 * rounds["small_blind_amount"])[:, None])[dealt], minlength=player_num)
+
+    ratio = lambda num, den: float(num) / float(den) if den else 0.0
+    return { name: {
+        "hands": int(hand_num[idx]),
+        "vpip": ratio(count(vpip)[idx], hand_num[idx]),
+        "pfr": ratio(count(pfr)[idx], hand_num[idx]),
+        "aggression": ratio(raise_num[idx], call_num[idx]),
+        "showdowns": int(showdown_num[idx]),
+        "showdown_win_rate": ratio(count(showdown & (net > 0))[idx], showdown_num[idx]),
+        "net": int(net_sum[idx]),
+        "bb_per_100": ratio(bb_sum[idx] * 100, hand_num[idx])
+        } for idx, name in enumerate(hands.players) }
+
+def profit_by_bucket(hands, bucket_table):
+    """{player name: {bucket: {"hands", "net", "mean"}}} grouped by the bucket of the hole cards.
+
+    bucket_table is a (53, 53) int array indexed by the two hole card ids.
+    """
+    rounds, player_ids = hands.rounds, hands.player_ids
+    dealt = rounds["pay_status"] != PayInfo.FOLDED
+    net = (rounds["result_stack"] - rounds["stack"])[dealt]
+    card_ids = rounds["card_ids"]
+    buckets = np.asarray(bucket_table)[card_ids[:, 0:-5:2], card_ids[:, 1:-5:2]][dealt]
+    bucket_num = int(buckets.max()) + 1 if len(buckets) else 0
+    keys = player_ids[dealt] * bucket_num + buckets
+    key_num = len(hands.players) * bucket_num
+    hand_num = np.bincount(keys, minlength=key_num)
+    net_sum = np.bincount(keys, weights=net, minlength=key_num)
+
+    result = {}
+    for idx, name in enumerate(hands.players):
+        result[name] = { bucket: {
+            "hands": int(hand_num[idx * bucket_num + bucket]),
+            "net": int(net_sum[idx * bucket_num + bucket]),
+            "mean": net_sum[idx * bucket_num + bucket] / hand_num[idx * bucket_num + bucket]
+            } for bucket in range(bucket_num) if hand_num[idx * bucket_num + bucket] }
+    return result
+
+
+def _map_file(path):
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == b"\x1f\x8b"
+    if compressed:
+        with gzip.open(path, "rb") as f:
+            return np.frombuffer(f.read(), dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+# ((offset, size) of game record bodies, offsets of round record bodies, game index of each round)
+def _scan_records(data, path):
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("%s is not a hand history file" % path)
+    game_offsets, round_offsets, round_games = [], [], []
+    pos, end = len(MAGIC), len(data)
+    while pos < end:
+        record_type, size = _RECORD_HEADER.unpack_from(data, pos)
+        pos += _RECORD_HEADER.size
+        if pos + size > end:
+            raise ValueError("Hand history [%s] ends in the middle of a record" % path)
+        if record_type == GAME_RECORD:
+            game_offsets.append((pos, size))
+        elif record_type == ROUND_RECORD:
+            round_offsets.append(pos)
+            round_games.append(len(game_offsets) - 1)
+        else:
+            raise ValueError("Unknown hand history record type [%d]" % record_type)
+        pos += size
+    return game_offsets, round_offsets, round_games
+
+def _round_header_dtype(player_num):
+    return np.dtype([
+        ("round_count", "<u4"), ("small_blind_amount", "<u4"), ("ante", "<u4"),
+        ("dealer_btn", "u1"), ("sb_pos", "u1"), ("bb_pos", "u1"), ("player_num", "u1"),
+        ("seats", [("stack", "<i4"), ("pay_status", "u1")], (player_num,)),
+        ("card_ids", "u1", (2 * player_num + 5,)), ("action_num", "<u2")])
+
+def _gather_rounds(data, offsets):
+    player_num = int(data[offsets[0] + 15])
+    if np.any(data[offsets + 15] != player_num):
+        raise ValueError("Hand histories with different numbers of seats can not be loaded together")
+    header_dtype = _round_header_dtype(player_num)
+    headers = _gather_bytes(data, offsets, header_dtype.itemsize).view(header_dtype).reshape(-1)
+
+    action_num = headers["action_num"].astype(np.int64)
+    action_offsets = offsets + header_dtype.itemsize
+    result_stacks = _gather_bytes(data, action_offsets + action_num, 4 * player_num).view("<i4")
+
+    rounds = np.zeros(len(offsets), dtype=[
+        ("round_count", np.int64), ("small_blind_amount", np.int64), ("ante", np.int64),
+        ("dealer_btn", np.int64), ("sb_pos", np.int64), ("bb_pos", np.int64),
+        ("stack", np.int64, (player_num,)), ("pay_status", np.uint8, (player_num,)),
+        ("card_ids", np.uint8, (2 * player_num + 5,)), ("result_stack", np.int64, (player_num,))])
+    for field in ("round_count", "small_blind_amount", "ante", "dealer_btn", "sb_pos", "bb_pos", "card_ids"):
+        rounds[field] = headers[field]
+    rounds["stack"] = headers["seats"]["stack"]
+    rounds["pay_status"] = headers["seats"]["pay_status"]
+    rounds["result_stack"] = result_stacks
+
+    # every action byte of every round, in log order
+    total = int(action_num.sum())
+    starts = np.cumsum(action_num) - action_num
+    action_round = np.repeat(np.arange(len(offsets)), action_num)
+    codes = data[np.repeat(action_offsets, action_num) + np.arange(total) - np.repeat(starts, action_num)]
+    actions = np.zeros(total, dtype=_ACTION_DTYPE)
+    actions["round"] = action_round
+    actions["street"] = codes >> 6
+    actions["seat"] = (codes >> 2) & 15
+    actions["action"] = codes & 3
+    return rounds, actions
+
+def _gather_bytes(data, offsets, size):
+    return np.ascontiguousarray(data[offsets[:, None] + np.arange(size)])
+
+def _player_index(players, name):
+    if name not in players: players.append(name)
+    return players.index(name)
+
+# number of earlier flagged actions in the same street of the same round
+def _prior_count_in_street(act_round, street, flags):
+    flags = flags.astype(np.int64)
+    key = act_round * 4 + street
+    first = np.ones(len(key), dtype=bool)
+    first[1:] = key[1:] != key[:-1]
+    before = np.cumsum(flags) - flags
+    first_idx = np.maximum.accumulate(np.where(first, np.arange(len(key)), 0))
+    return before - before[first_idx]
+
+# (round num, seat num) bool array, True where the seat made one of the masked actions
+def _flag_seats(rounds, actions, mask):
+    flags = np.zeros(rounds["stack"].shape, dtype=bool)
+    flags[actions["round"][mask], actions["seat"][mask]] = True
+    return flags
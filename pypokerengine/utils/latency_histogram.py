@@ -0,0 +1,83 @@
+import math
+import inspect
+from functools import wraps
+from time import perf_counter
+
+class LatencyHistogram(object):
+    """Log-bucketed histogram of decision times in seconds, plus a timeout count.
+
+    Bucket i holds latencies up to MIN_LATENCY * 2 ** ((i + 1) / BUCKETS_PER_DOUBLING),
+    so percentiles are upper bounds that are at most ~19% too high, and the
+    histogram stays the same size however many decisions are recorded.
+    """
+
+    MIN_LATENCY = 1e-6
+    BUCKETS_PER_DOUBLING = 4
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+
+    def add(self, latency):
+        bucket = self.__bucket_of(latency)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def add_timeout(self):
+        self.timeouts += 1
+
+    def percentile(self, q):
+        if self.count == 0: return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.__upper_bound(bucket), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+                "count": self.count,
+                "timeouts": self.timeouts,
+                "mean": self.total / self.count if self.count else 0.0,
+                "p50": self.percentile(50),
+                "p95": self.percentile(95),
+                "p99": self.percentile(99),
+                "max": self.max
+                }
+
+    def __bucket_of(self, latency):
+        if latency <= self.MIN_LATENCY: return 0
+        return max(int(math.ceil(math.log(latency / self.MIN_LATENCY, 2) * self.BUCKETS_PER_DOUBLING)) - 1, 0)
+
+    def __upper_bound(self, bucket):
+        return self.MIN_LATENCY * 2 ** ((bucket + 1) / self.BUCKETS_PER_DOUBLING)
+
+def record_latency(histogram):
+    """Decorator adding the wall time of every call to histogram, coroutine functions are timed until they finish"""
+    def decorate(function):
+        if inspect.iscoroutinefunction(function):
+            @wraps(function)
+            async def new_coroutine_function(*args, **kwargs):
+                start = perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    histogram.add(perf_counter() - start)
+            return new_coroutine_function
+
+        @wraps(function)
+        def new_function(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.add(perf_counter() - start)
+        return new_function
+    return decorate
@@ -0,0 +1,33 @@
+from time import perf_counter
+
+class PhaseProfiler(object):
+    """Cumulative wall time and call count per phase of a game.
+
+    Phases nest: "deal" and "apply_action" include the "message_build" and
+    "showdown" time spent inside them, and "game" covers the whole game.
+    Players' decisions are recorded as "declare_action:<player name>".
+    """
+
+    def __init__(self):
+        self.times = {}
+        self.counts = {}
+
+    def measure(self, phase, func, *args):
+        start = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.add(phase, perf_counter() - start)
+
+    def add(self, phase, elapsed):
+        self.times[phase] = self.times.get(phase, 0.0) + elapsed
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def summary(self):
+        return { phase: { "time": self.times[phase], "count": self.counts[phase],
+            "mean": self.times[phase] / self.counts[phase] } for phase in self.times }
+
+def profiled(profiler, phase, func, *args):
+    """func(*args), timed as phase when a profiler is given"""
+    if profiler is None: return func(*args)
+    return profiler.measure(phase, func, *args)
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from itertools import combinations
+
+import numpy as np
+
+from pypokerengine.engine.card import Card
+from pypokerengine.utils.batch_hand_evaluator import eval_hands
+
+# every two card hand as card ids (id1 < id2), the index is the combo index
+HOLE_COMBOS = np.array([(id1, id2) for id1 in range(1, 53) for id2 in range(id1 + 1, 53)])
+_COMBO_MASKS = (np.uint64(1) << HOLE_COMBOS[:, 0].astype(np.uint64)) | (np.uint64(1) << HOLE_COMBOS[:, 1].astype(np.uint64))
+
+class RangeEquity(object):
+    """Heads-up equity of a hand against a weighted range of opponent hole cards.
+
+    weights has one entry per combo of HOLE_COMBOS, None is the uniform range of
+    estimate_hole_card_win_rate.
+
+    When the community cards have at most max_boards completions (turn and river)
+    every board is enumerated against every combo, and the opponent scores of all
+    combos on a full board are cached per board, so the river and repeated
+    decisions of the hand mostly hit the cache. Scoring one uncached board costs ~3ms.
+    Otherwise (preflop and flop) samples pairs of an opponent combo drawn by
+    weight and a board are evaluated, ~0.004 standard error for 20000 samples,
+    and the result is cached per hole cards, community cards and weights.
+    """
+
+    def __init__(self, max_boards=100, samples=20000, cache_size=4096, seed=None, chunk_boards=64):
+        self.max_boards = max_boards
+        self.samples = samples
+        self.cache_size = cache_size
+        self.chunk_boards = chunk_boards
+        self.rng = np.random.default_rng(seed)
+        self.__board_scores = OrderedDict()   # board card ids -> (1326,) opponent scores
+        self.__sampled_equities = OrderedDict()
+
+    def equity(self, hole_card, community_card=None, weights=None):
+        """Win probability plus half the tie probability, from 0 to 1"""
+        hole_ids = _to_ids(hole_card)
+        community_ids = _to_ids(community_card or [])
+        weights = np.ones(len(HOLE_COMBOS)) if weights is None else np.asarray(weights, dtype=np.float64)
+        deck = np.array(sorted(set(range(1, 53)) - set(hole_ids) - set(community_ids)))
+        if _count_combinations(len(deck), 5 - len(community_ids)) > self.max_boards:
+            key = (tuple(hole_ids), tuple(sorted(community_ids)), hash(weights.tobytes()))
+            if key not in self.__sampled_equities:
+                self.__cache(self.__sampled_equities, key, self.__sampled_equity(hole_ids, community_ids, weights))
+            return self.__sampled_equities[key]
+
+        boards = self.__enumerate_boards(community_ids, deck)
+        opponent_scores = self.__scores_of(boards)
+        my_scores = eval_hands(np.tile(hole_ids, (len(boards), 1)), boards)
+        dead = np.zeros(len(boards), dtype=np.uint64) | _mask_of(hole_ids)
+        for idx in range(5):
+            dead |= np.uint64(1) << boards[:, idx].astype(np.uint64)
+        live = (_COMBO_MASKS[None, :] & dead[:, None]) == 0
+
+        result = (my_scores[:, None] > opponent_scores) + 0.5 * (my_scores[:, None] == opponent_scores)
+        total_weight = (live * weights).sum()
+        if total_weight == 0:
+            raise ValueError(_NO_WEIGHT_MSG)
+        return float((result * live * weights).sum() / total_weight)
+
+    def __enumerate_boards(self, community_ids, deck):
+        missing = 5 - len(community_ids)
+        drawn = np.array(list(combinations(deck, missing)), dtype=np.int64).reshape(-1, missing) if missing else np.zeros((1, 0), dtype=np.int64)
+        known = np.tile(np.array(community_ids, dtype=np.int64), (len(drawn), 1))
+        return np.sort(np.concatenate([known, drawn], axis=1), axis=1)
+
+    def __sampled_equity(self, hole_ids, community_ids, weights):
+        live_weights = weights * ((_COMBO_MASKS & _mask_of(hole_ids + community_ids)) == 0)
+        if live_weights.sum() == 0:
+            raise ValueError(_NO_WEIGHT_MSG)
+        combos = HOLE_COMBOS[self.rng.choice(len(HOLE_COMBOS), self.samples, p=live_weights / live_weights.sum())]
+
+        # draw the rest of each board from the cards nobody holds, card id - 1 is the key index
+        keys = self.rng.random((self.samples, 52))
+        keys[:, np.array(hole_ids + community_ids) - 1] = 2.0
+        keys[np.arange(self.samples)[:, None], combos - 1] = 2.0
+        drawn = keys.argsort(axis=1)[:, :5 - len(community_ids)] + 1
+        boards = np.concatenate([np.tile(np.array(community_ids, dtype=np.int64), (self.samples, 1)), drawn], axis=1)
+
+        my_scores = eval_hands(np.tile(hole_ids, (self.samples, 1)), boards)
+        opponent_scores = eval_hands(combos, boards)
+        return float(np.mean((my_scores > opponent_scores) + 0.5 * (my_scores == opponent_scores)))
+
+    # (board num, 1326) opponent scores, evaluated in chunks of boards for the uncached ones
+    def __scores_of(self, boards):
+        keys = [board.tobytes() for board in boards]
+        found = {}
+        for key in keys:
+            if key in self.__board_scores:
+                self.__board_scores.move_to_end(key)
+                found[key] = self.__board_scores[key]
+        missing = [idx for idx, key in enumerate(keys) if key not in found and keys.index(key) == idx]
+        combo_num = len(HOLE_COMBOS)
+        for start in range(0, len(missing), self.chunk_boards):
+            chunk = boards[missing[start:start + self.chunk_boards]]
+            scores = eval_hands(np.tile(HOLE_COMBOS, (len(chunk), 1)), np.repeat(chunk, combo_num, axis=0))
+            for board, board_scores in zip(chunk, scores.reshape(len(chunk), combo_num)):
+                found[board.tobytes()] = board_scores
+                self.__cache(self.__board_scores, board.tobytes(), board_scores)
+        return np.array([found[key] for key in keys])
+
+    def __cache(self, cache, key, value):
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+
+_NO_WEIGHT_MSG = "The opponent range has no weight on any possible hole cards"
+
+_default_range_equity = RangeEquity()
+
+def estimate_range_equity(hole_card, community_card=None, weights=None):
+    """RangeEquity.equity with a shared board cache"""
+    return _default_range_equity.equity(hole_card, community_card, weights)
+
+def _to_ids(cards):
+    return [card.to_id() if isinstance(card, Card) else Card.from_str(card).to_id() for card in cards]
+
+def _mask_of(card_ids):
+    mask = np.uint64(0)
+    for card_id in card_ids:
+        mask |= np.uint64(1) << np.uint64(card_id)
+    return mask
+
+def _count_combinations(n, k):
+    count = 1
+    for idx in range(k):
+        count = count * (n - idx) // (idx + 1)
+    return count
@@ -0,0 +1,36 @@
+import random
+
+def derive_rng(seed, *keys):
+    """Independent random.Random stream for a master seed and keys, eg derive_rng(seed, game_number).
+
+    String seeds are hashed with SHA-512, so streams do not depend on PYTHONHASHSEED
+    and any worker can rebuild the stream of any game on its own.
+    """
+    return random.Random(":".join(str(key) for key in (seed,) + keys))
+
+def clone_rng(rng):
+    """random.Random at the same point of the stream as rng (a random.Random or the random module),
+    drawing from the clone leaves rng untouched"""
+    clone = random.Random()
+    clone.setstate(rng.getstate())
+    return clone
+
+class DeferredClone(object):
+    """Stands in for clone_rng(rng) and makes the clone on first use.
+
+    Game state copies shuffle from one of these, so copies that never shuffle cost
+    nothing and the ones that do start from wherever rng is at that point, without moving it.
+    """
+
+    def __init__(self, rng):
+        self.__rng = rng
+        self.__clone = None
+
+    def __getattr__(self, name):
+        if self.__clone is None: self.__clone = clone_rng(self.__rng)
+        return getattr(self.__clone, name)
+
+def spawn_rng(rng):
+    """Child stream drawn from a parent random.Random"""
+    return random.Random(rng.getrandbits(64))
+
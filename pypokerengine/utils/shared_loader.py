@@ -0,0 +1,34 @@
+import gc
+import os
+
+# process-wide cache of loaded files {(loader, absolute path): (mtime, loaded object)}
+_shared = {}
+
+def load_shared(filename, loader):
+    """loader(path) through a process-wide cache, so every player that loads the same
+    file (eg a trained tree or policy) gets the same object. Treat it as read-only.
+
+    The file is loaded again when its mtime changes.
+    """
+    path = os.path.abspath(filename)
+    if not os.path.exists(path):
+        raise FileNotFoundError("JSON file %s not found" % filename)
+
+    mtime = os.path.getmtime(path)
+    cached = _shared.get((loader, path))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    loaded = loader(path)
+    _shared[(loader, path)] = (mtime, loaded)
+    return loaded
+
+def freeze_shared():
+    """Call in the parent after loading the shared files and before forking worker processes.
+
+    Frozen objects are skipped by the garbage collector, so collections in the workers do not
+    write to the pages of the loaded objects. Reading a node still updates its refcount, so
+    a worker only copies the pages of the nodes its players actually look at.
+    """
+    gc.collect()
+    gc.freeze()
@@ -11,6 +11,7 @@ from __future__ import division
 
 import sys
 import time
+import asyncio
 import multiprocessing
 import signal
 from functools import wraps
@@ -93,10 +94,11 @@ def timeout(seconds=None, use_signals=True, timeout_exception=TimeoutError, exce
 
     return decorate
 
-def timeout2(seconds=None, defaultretval="Blah",exception_message="[EXP]: Action TimedOut",timeout_exception=TimeoutError):
+def timeout2(seconds=None, defaultretval="Blah",exception_message="[EXP]: Action TimedOut",timeout_exception=TimeoutError,on_timeout=None):
     """
         Similar as before return a default value instead.
         Uses Signals. Can you use multiprocessing instead.
+        on_timeout, when given, is called without arguments on every timeout.
     """
     def decorate(function):
 
@@ -120,6 +122,7 @@ def timeout2(seconds=None, defaultretval="Blah",exception_message="[EXP]: Action
                 return function(*args, **kwargs)
             except TimeoutError :
                 print(exception_message)
+                if on_timeout: on_timeout()
                 return defaultretval
             finally:
                 if new_seconds:
@@ -129,6 +132,29 @@ def timeout2(seconds=None, defaultretval="Blah",exception_message="[EXP]: Action
 
     return decorate
 
+def async_timeout(seconds=None, defaultretval="Blah",exception_message="[EXP]: Action TimedOut",on_timeout=None):
+    """
+        timeout2 for coroutine functions, with asyncio.wait_for instead of signals.
+        Only the awaiting coroutine is cancelled, the event loop keeps running.
+    """
+    def decorate(function):
+
+        if not seconds:
+            return function
+
+        @wraps(function)
+        async def new_function(*args, **kwargs):
+            new_seconds = kwargs.pop('timeout', seconds)
+            try:
+                return await asyncio.wait_for(function(*args, **kwargs), new_seconds)
+            except asyncio.TimeoutError :
+                print(exception_message)
+                if on_timeout: on_timeout()
+                return defaultretval
+        return new_function
+
+    return decorate
+
 def _target(queue, function, *args, **kwargs):
     """Run a function with arguments and return output via a queue.
 
@@ -4,6 +4,8 @@ import pprint
 
 class RaisedPlayer(BasePokerPlayer):
 
+  notifications = frozenset()
+
   # passes action onto poker engine
   # currently always raises if possible, otherwise calls
   def declare_action(self, valid_actions, hole_card, round_state):
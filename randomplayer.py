@@ -1,9 +1,10 @@
 from pypokerengine.players import BasePokerPlayer
-import random as rand
 import pprint
 
 class RandomPlayer(BasePokerPlayer):
 
+  notifications = frozenset()
+
   def declare_action(self, valid_actions, hole_card, round_state):
     # valid_actions format => [raise_action_pp = pprint.PrettyPrinter(indent=2)
     #pp = pprint.PrettyPrinter(indent=2)
@@ -14,7 +15,7 @@ class RandomPlayer(BasePokerPlayer):
     #print("------------VALID_ACTIONS----------")
     #pp.pprint(valid_actions)
     #print("-------------------------------")
-    r = rand.random()
+    r = self.rng.random()
     if r <= 0.5:
       call_action_info = valid_actions[1]
     elif r <= 0.9 and len(valid_actions ) == 3:
@@ -0,0 +1,181 @@
+""" Early stopping agent comparison with a sequential probability ratio test.
+
+Deals are played as duplicate pairs (each deal twice with the seats swapped, stacks reset every hand)
+and the mbb/hand of agent 1 is streamed into the test after every pair. The run stops as soon as
+one agent is better by more than the indifference margin, or after max_deals pairs.
+
+$ PYTHONPATH=. python sprtperf.py -a1 HandPlayer -a2 RandomPlayer -w 4 -s 1
+"""
+from player_registry import make_player
+from pypokerengine.api.game import play_dealt_round
+from pypokerengine.engine.dealer import Dealer
+from pypokerengine.utils.rng_utils import derive_rng
+from pypokerengine.utils.shared_loader import freeze_shared
+from multiprocessing import Pool
+from collections import deque
+from argparse import ArgumentParser
+import random
+import math
+import time
+
+# players of this process, forked workers inherit the ones built in the parent
+_workerPlayers = None
+
+class SPRT:
+	"""Normal approximation SPRT of H0: mean = -margin against H1: mean = +margin.
+
+	Accepting H1 means agent 1 is better, accepting H0 means agent 2 is better.
+	"""
+
+	def __init__(self, margin=50.0, alpha=0.05, beta=0.05, min_samples=30):
+		self.margin = margin
+		self.min_samples = min_samples
+		self.lower = math.log(beta / (1 - alpha))
+		self.upper = math.log((1 - beta) / alpha)
+
+		# running mean and sum of squared deviations (Welford)
+		self.count = 0
+		self.mean = 0.0
+		self.m2 = 0.0
+
+	def add(self, sample):
+		self.count += 1
+		delta = sample - self.mean
+		self.mean += delta / self.count
+		self.m2 += delta * (sample - self.mean)
+
+	def variance(self):
+		return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+	def llr(self):
+		variance = self.variance()
+		if variance == 0:
+			return 0.0
+		# log likelihood ratio of the two normal means, the sample variance stands in for the true one
+		return 2 * self.margin * self.mean * self.count / variance
+
+	def confidence95(self):
+		return 1.96 * math.sqrt(self.variance() / self.count) if self.count else 0.0
+
+	# "H1" (agent 1 better), "H0" (agent 2 better) or None to keep playing
+	def decision(self):
+		if self.count < self.min_samples:
+			return None
+		llr = self.llr()
+		if llr >= self.upper:
+			return "H1"
+		if llr <= self.lower:
+			return "H0"
+		return None
+
+def _buildPlayers(agent1_class, agent2_class):
+	global _workerPlayers
+	_workerPlayers = (make_player(agent1_class), make_player(agent2_class))
+
+# forked workers already have the parent's players, only spawned ones build their own
+def _setupWorker(agent1_class, agent2_class):
+	if _workerPlayers is None:
+		_buildPlayers(agent1_class, agent2_class)
+
+# plays one batch of duplicate pairs, returns mbb/hand of agent 1 for every pair
+def _playBatch(job):
+	seed, batch, deals, smallblind_amount, initial_stack = job
+	big_blind = smallblind_amount * 2
+
+	# everything in a batch is derived from (seed, batch) so results do not depend on the worker count
+	dealer = Dealer(smallblind_amount, initial_stack, rng=derive_rng(seed, "sprt", batch))
+	dealer.register_player("agent1", _workerPlayers[0])
+	dealer.register_player("agent2", _workerPlayers[1])
+	seats = list(dealer.table.seats.players)
+	uuid1 = seats[0].uuid
+	deck_rng = derive_rng(seed, "sprt-deals", batch)
+
+	results = []
+	for deal in range(deals):
+		deck_ids = deck_rng.sample(range(1, 53), 52)
+		won = 0
+		for players in (seats, seats[::-1]):
+			won += play_dealt_round(dealer, list(players), deck_ids, deal + 1, initial_stack)[uuid1]
+		results.append(1000.0 * won / big_blind / 2)
+	return results
+
+def _jobs(seed, batch_size, smallblind_amount, initial_stack):
+	batch = 0
+	while True:
+		yield (seed, batch, batch_size, smallblind_amount, initial_stack)
+		batch += 1
+
+# results of the jobs in order, with at most window jobs queued in the pool so it stops soon after the test does
+def _windowedBatches(pool, jobs, window):
+	pending = deque(pool.apply_async(_playBatch, (next(jobs),)) for _ in range(window))
+	while True:
+		results = pending.popleft().get()
+		pending.append(pool.apply_async(_playBatch, (next(jobs),)))
+		yield results
+
+def sprtperf(agent1_class, agent2_class, margin=50.0, alpha=0.05, beta=0.05, max_deals=100000,
+		batch_size=50, workers=1, seed=None, smallblind_amount=20, initial_stack=10000, report_every=500):
+	test = SPRT(margin, alpha, beta)
+	seed = seed if seed is not None else random.getrandbits(64)
+	jobs = _jobs(seed, batch_size, smallblind_amount, initial_stack)
+
+	# build the players, and load their trees, in the parent so forked workers share them
+	_buildPlayers(agent1_class, agent2_class)
+
+	if workers > 1:
+		freeze_shared()
+		pool = Pool(workers, initializer=_setupWorker, initargs=(agent1_class, agent2_class))
+		# batches come back in order, so the stopping point is the same for any number of workers
+		batches = _windowedBatches(pool, jobs, workers * 2)
+	else:
+		pool = None
+		batches = map(_playBatch, jobs)
+
+	decision = None
+	for results in batches:
+		for result in results:
+			test.add(result)
+			decision = test.decision()
+			if test.count % report_every == 0:
+				print("Deals: %d, %.1f +/- %.1f mbb/hand, LLR %.2f" % (test.count, test.mean, test.confidence95(), test.llr()))
+			if decision or test.count >= max_deals:
+				break
+		if decision or test.count >= max_deals:
+			break
+
+	if pool:
+		pool.terminate()
+		pool.join()
+
+	return {
+		"decision": decision,
+		"deals": test.count,
+		"hands": test.count * 2,
+		"mbbPerHand": test.mean,
+		"confidence95": test.confidence95(),
+		"llr": test.llr()
+	}
+
+def parse_arguments():
+	parser = ArgumentParser()
+	parser.add_argument('-a1', '--agent1', help="Agent 1", default="RandomPlayer", type=str)
+	parser.add_argument('-a2', '--agent2', help="Agent 2", default="RandomPlayer", type=str)
+	parser.add_argument('-m', '--margin', help="Indifference margin in mbb/hand", default=50.0, type=float)
+	parser.add_argument('--alpha', help="Chance of wrongly declaring agent 1 better", default=0.05, type=float)
+	parser.add_argument('--beta', help="Chance of wrongly declaring agent 2 better", default=0.05, type=float)
+	parser.add_argument('-n', '--max_deals', help="Duplicate deals after which the test gives up", default=100000, type=int)
+	parser.add_argument('-b', '--batch', help="Duplicate deals per worker job", default=50, type=int)
+	parser.add_argument('-w', '--workers', help="Worker processes", default=1, type=int)
+	parser.add_argument('-s', '--seed', help="Master seed for the dealt cards", default=None, type=int)
+	return parser.parse_args()
+
+if __name__ == '__main__':
+	args = parse_arguments()
+	start = time.time()
+	result = sprtperf(args.agent1, args.agent2, args.margin, args.alpha, args.beta, args.max_deals, args.batch, args.workers, args.seed)
+	end = time.time()
+
+	verdict = {"H1": args.agent1 + " is better", "H0": args.agent2 + " is better", None: "no decision"}[result["decision"]]
+	print("\n After %d duplicate deals (%d hands): %s" % (result["deals"], result["hands"], verdict))
+	print("\n " + args.agent1 + ": %.1f +/- %.1f mbb/hand (95%% confidence)" % (result["mbbPerHand"], result["confidence95"]))
+	print("\n Time taken to play: %.4f seconds" % (end - start))
@@ -3,6 +3,7 @@ import random as rand
 import math
 import json
 import os
+from pypokerengine.utils.shared_loader import load_shared
 
 class MCTSNode:
 	def __init__(self, state, parent=None, action=None, isNature=False, isOpponent=False, street="preflop"):
@@ -478,6 +479,10 @@ class MCTSTree:
 		tree.root = nodeDict[jsonTree["root"]]
 		
 		return tree
+	
+    # load tree through the process-wide cache of load_shared, the returned tree is shared so treat it as read-only
+	def loadShared(filename):
+		return load_shared(filename, MCTSTree.loadFromJson)
 
 def trainMCTS(iterations=10000, simulationsPerIteration=100):
 	# train an MCTS tree
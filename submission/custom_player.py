@@ -6,6 +6,8 @@ from state_abstraction import StateAbstraction
 
 
 class CustomPlayer(BasePokerPlayer):
+	notifications = frozenset()
+
 	def __init__(self, treeFile="trained_mcts_tree2000.json"):
 		# initialize hand counter to track the number of hands played
 		self.handCount = 0
@@ -20,7 +22,7 @@ class CustomPlayer(BasePokerPlayer):
 		self.lastStreet = None
 
 	def load_tree(self):
-		tree = MCTSTree.loadFromJson(self.treeFile)
+		tree = MCTSTree.loadShared(self.treeFile)
 		return tree
 
 	def declare_action(self, validActions, holeCard, roundState):
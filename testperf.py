@@ -3,18 +3,14 @@ sys.path.insert(0, './pypokerengine/api/')
 import game
 setup_config = game.setup_config
 start_poker = game.start_poker
+start_duplicate_poker = game.start_duplicate_poker
+from pypokerengine.api.remote_player import RemotePlayer
+from player_registry import make_player
 import time
 from argparse import ArgumentParser
 
 
-""" =========== *Remember to import your agent!!! =========== """
-from randomplayer import RandomPlayer
-from raise_player import RaisedPlayer
-from pokerBotPlayer import PokerBotPlayer
-from AI13Player import AI13Player
-from hand_player import HandPlayer
-# from smartwarrior import SmartWarrior
-""" ========================================================= """
+# Agents are registered by name in player_registry.py
 
 """ Example---To run testperf.py with random warrior AI against itself. 
 
@@ -23,12 +19,17 @@ $ python testperf.py -n1 "Random Warrior 1" -a1 RandomPlayer -n2 "Random Warrior
 python3 testperf.py -n1 "Poker Bot" -a1 PokerBotPlayer -n2 "Rando" -a2 RandomPlayer
 python3 testperf.py -n1 "Poker Bot" -a1 PokerBotPlayer -n2 "Raiser" -a2 RaisedPlayer
 python3 testperf.py -n1 "oldBot" -a1 PokerBotPlayer -n2 "newBot" -a2 PokerBotPlayer_0_2_0
+
+Duplicate mode plays every game twice with the same cards and the seats swapped, far fewer games are needed.
+python3 testperf.py -n1 "Poker Bot" -a1 PokerBotPlayer -n2 "Raiser" -a2 RaisedPlayer -d -g 20
+
+remote:module:ClassName runs the agent in its own process (see pypokerengine/api/bot_host.py).
+python3 testperf.py -n1 "Poker Bot" -a1 remote:pokerBotPlayer:PokerBotPlayer -n2 "Rando" -a2 RandomPlayer
 """
 
-def testperf(agent_name1, agent1_class, agent_name2, agent2_class):		
+def testperf(agent_name1, agent1_class, agent_name2, agent2_class, seed=None, num_game=500, duplicate=False):		
 
-	# Init to play 500 games of 1000 rounds
-	num_game = 500
+	# Init to play num_game games of 1000 rounds
 	max_round = 1000
 	initial_stack = 10000
 	smallblind_amount = 20
@@ -36,22 +37,14 @@ def testperf(agent_name1, agent1_class, agent_name2, agent2_class):
 	# Init pot of players
 	agent1_pot = 0
 	agent2_pot = 0
+	paired_differences = []
 
 	# Setting configuration
-	config = setup_config(max_round=max_round, initial_stack=initial_stack, small_blind_amount=smallblind_amount)
+	config = setup_config(max_round=max_round, initial_stack=initial_stack, small_blind_amount=smallblind_amount, seed=seed)
 	
 
-    # Convert string class names to actual classes
-	player_classes = {
-        'RandomPlayer': RandomPlayer,
-        'RaisedPlayer': RaisedPlayer,
-        'PokerBotPlayer': PokerBotPlayer,
-		'AI13Player': AI13Player,
-		'HandPlayer': HandPlayer
-    }
-    
-	agent1 = player_classes[agent1_class]()
-	agent2 = player_classes[agent2_class]()
+	agent1 = make_player(agent1_class)
+	agent2 = make_player(agent2_class)
 
 	# Register players
 	# config.register_player(name=agent_name1, algorithm=RandomPlayer())
@@ -62,15 +55,32 @@ def testperf(agent_name1, agent1_class, agent_name2, agent2_class):
 	# Start playing num_game games
 	for game in range(1, num_game+1):
 		print("Game number: ", game)
-		game_result = start_poker(config, verbose=0)
+		if duplicate:
+			game_result = start_duplicate_poker(config, verbose=0)
+			paired_differences.append(game_result['paired_difference'])
+		else:
+			game_result = start_poker(config, verbose=0)
 		agent1_pot = agent1_pot + game_result['players'][0]['stack']
 		agent2_pot = agent2_pot + game_result['players'][1]['stack']
 
+	for agent in (agent1, agent2):
+		if isinstance(agent, RemotePlayer): agent.close()
+
 	print("\n After playing {} games of {} rounds, the results are: ".format(num_game, max_round))
 	# print("\n Agent 1's final pot: ", agent1_pot)
 	print("\n " + agent_name1 + "'s final pot: ", agent1_pot)
 	print("\n " + agent_name2 + "'s final pot: ", agent2_pot)
 
+	if duplicate:
+		# every game is a pair of seat-swapped games, the mean paired difference is agent 1's edge over 2 games
+		mean = sum(paired_differences) / num_game
+		variance = sum((d - mean) ** 2 for d in paired_differences) / max(num_game - 1, 1)
+		print("\n Mean paired difference: %.1f +/- %.1f chips per game pair (95%% confidence)" % (mean, 1.96 * (variance / num_game) ** 0.5))
+
+	for agent_number, latency in enumerate(game_result['latency'], 1):
+		print("\n Agent %d (%s)'s decisions: p50 %.4fs, p95 %.4fs, p99 %.4fs, max %.4fs, %d timed out of %d" % (
+			agent_number, latency['name'], latency['p50'], latency['p95'], latency['p99'], latency['max'], latency['timeouts'], latency['count']))
+
 	print("\n ", game_result)
 	print("\n Random player's final stack: ", game_result['players'][0]['stack'])
 	print("\n " + agent_name1 + "'s final stack: ", game_result['players'][1]['stack'])
@@ -87,16 +97,19 @@ def testperf(agent_name1, agent1_class, agent_name2, agent2_class):
 def parse_arguments():
     parser = ArgumentParser()
     parser.add_argument('-n1', '--agent_name1', help="Name of agent 1", default="Your agent", type=str)
-    parser.add_argument('-a1', '--agent1', help="Agent 1", default=RandomPlayer())    
+    parser.add_argument('-a1', '--agent1', help="Agent 1", default="RandomPlayer")    
     parser.add_argument('-n2', '--agent_name2', help="Name of agent 2", default="Your agent", type=str)
-    parser.add_argument('-a2', '--agent2', help="Agent 2", default=RandomPlayer())    
+    parser.add_argument('-a2', '--agent2', help="Agent 2", default="RandomPlayer")    
+    parser.add_argument('-s', '--seed', help="Master seed for reproducible games", default=None, type=int)
+    parser.add_argument('-g', '--games', help="Number of games to play", default=500, type=int)
+    parser.add_argument('-d', '--duplicate', help="Replay every game with the seats swapped", action='store_true')
     args = parser.parse_args()
-    return args.agent_name1, args.agent1, args.agent_name2, args.agent2
+    return args.agent_name1, args.agent1, args.agent_name2, args.agent2, args.seed, args.games, args.duplicate
 
 if __name__ == '__main__':
-	name1, agent1, name2, agent2 = parse_arguments()
+	name1, agent1, name2, agent2, seed, num_game, duplicate = parse_arguments()
 	start = time.time()
-	testperf(name1, agent1, name2, agent2)
+	testperf(name1, agent1, name2, agent2, seed, num_game, duplicate)
 	end = time.time()
 
 	print("\n Time taken to play: %.4f seconds" %(end-start))
\ No newline at end of file